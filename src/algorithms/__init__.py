@@ -0,0 +1,92 @@
+from algorithms.registry import Algorithm
+
+
+# The algorithms that are available in the image processor. The index in this list is the ID of the algorithm.
+# Their modules are only imported when they are used for the first time (see Algorithm).
+ALGORITHMS = [
+    Algorithm("original", "algorithms.original", "original"),
+    Algorithm("grayscale", "algorithms.grayscale", "grayscale", parameters=["backend"]),
+    Algorithm(
+        "binarization (global threshold)",
+        "algorithms.binarization",
+        "binarize_global_threshold",
+        parameters=["backend"],
+    ),
+    Algorithm(
+        "binarization (adaptive mean threshold)",
+        "algorithms.binarization",
+        "binarize_adaptive_mean_threshold",
+        parameters=["backend"],
+    ),
+    Algorithm(
+        "binarization (adaptive gauss threshold)",
+        "algorithms.binarization",
+        "binarize_adaptive_gauss_threshold",
+        parameters=["backend"],
+    ),
+    Algorithm(
+        "edge detection (sobel x-direction)",
+        "algorithms.edge_detection",
+        "sobel_x",
+        parameters=["backend"],
+    ),
+    Algorithm(
+        "edge detection (sobel y-direction)",
+        "algorithms.edge_detection",
+        "sobel_y",
+        parameters=["backend"],
+    ),
+    Algorithm(
+        "edge detection (sobel xy-direction)",
+        "algorithms.edge_detection",
+        "sobel_xy",
+        parameters=["backend"],
+    ),
+    Algorithm("edge detection (canny)", "algorithms.edge_detection", "canny"),
+    Algorithm("optical flow", "algorithms.optical_flow", "optical_flow", stateful=True),
+    Algorithm(
+        "optical flow (dense, farneback)",
+        "algorithms.dense_optical_flow",
+        "dense_optical_flow",
+        stateful=True,
+        parameters=["dense_flow_scale", "dense_flow_levels"],
+    ),
+    Algorithm(
+        "corner detection (harris)",
+        "algorithms.corner_detection",
+        "harris",
+        parameters=["backend"],
+    ),
+]
+
+
+def get_algorithms(pipelines=None):
+    """
+    Returns the built-in algorithms followed by the algorithms composed of the given pipeline descriptions (like
+    "gray|blur:5|threshold:127", see ComposedAlgorithm), so their IDs follow the ones of the built-in algorithms.
+    Raises a ValueError if a description is invalid.
+    """
+    if not pipelines:
+        return ALGORITHMS
+    from algorithms.composed import ComposedAlgorithm
+
+    return ALGORITHMS + [ComposedAlgorithm(description) for description in pipelines]
+
+
+def print_markdown_table(algorithms):
+    """
+    This function prints the given algorithms with their respective ID, description and settings in a markdown
+    table so that it can be easily copy pasted into the repositories README.
+    """
+    print("Available algorithms and their IDs in a markdown table for the README:\n")
+    print("| ID | algorithm | settings |")
+    print("| :---: | :--- | :--- |")
+    for idx, algorithm in enumerate(algorithms):
+        settings = ", ".join(
+            f"`--{parameter.replace('_', '-')}`"
+            for parameter in getattr(algorithm, "parameters", ())
+        )
+        # The names of composed algorithms contain the pipes of their descriptions, which would end the cell.
+        name = algorithm.name.replace("|", "\\|")
+        print(f"| `{idx}` | {name} | {settings} |")
+    print("\n")
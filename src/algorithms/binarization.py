@@ -1,20 +1,30 @@
 import cv2
 
+from algorithms import numpy_backend
+from algorithms.frame_products import (
+    apply_tiled,
+    get_blurred,
+    get_buffer,
+    use_numpy_backend,
+)
+from algorithms.properties import halo
 
+
+# The size of the neighborhood of the adaptive thresholds.
+BLOCK_SIZE = 21
+
+# The size of the kernel of the blur applied before thresholding.
+BLUR_KSIZE = 5
+
+
+@halo(BLUR_KSIZE // 2)
 def binarize_global_threshold(params):
     """
     Binarize by a global threshold. First, the image will be converted to grayscale and then a threshold will
     be used to create a binary image.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = "binarization (global threshold)"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
 
@@ -22,28 +32,30 @@ def binarize_global_threshold(params):
     # If some more informations need to be passed to the next call of the same function, they can also be written
     # into the dictionary since they will only be overwritten when the algorithm changes.
 
-    img_grayscale = cv2.cvtColor(params["frame_curr"], cv2.COLOR_BGR2GRAY)
-    img_blurred = cv2.GaussianBlur(img_grayscale, (5, 5), 0)
-    (_, img_binary) = cv2.threshold(img_blurred, 127, 255, cv2.THRESH_BINARY)
+    img_blurred = get_blurred(params, BLUR_KSIZE)
+    if use_numpy_backend(params):
+        params["frame_result"] = numpy_backend.threshold(img_blurred, 127, 255)
+        return params
+    (_, img_binary) = cv2.threshold(
+        img_blurred,
+        127,
+        255,
+        cv2.THRESH_BINARY,
+        dst=get_buffer(params, "binarize_global_threshold", img_blurred.shape),
+    )
     params["frame_result"] = img_binary
 
     return params
 
 
+@halo(BLUR_KSIZE // 2 + BLOCK_SIZE // 2)
 def binarize_adaptive_mean_threshold(params):
     """
     Binarize by a adaptive mean threshold. First, the image will be converted to grayscale and then a threshold will
     be used to create a binary image.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = "binarization (adaptive mean threshold)"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
 
@@ -51,35 +63,40 @@ def binarize_adaptive_mean_threshold(params):
     # If some more informations need to be passed to the next call of the same function, they can also be written
     # into the dictionary since they will only be overwritten when the algorithm changes.
 
-    img_grayscale = cv2.cvtColor(params["frame_curr"], cv2.COLOR_BGR2GRAY)
-    img_blurred = cv2.GaussianBlur(img_grayscale, (5, 5), 0)
-    img_binary = cv2.adaptiveThreshold(
+    img_blurred = get_blurred(params, BLUR_KSIZE)
+    if use_numpy_backend(params):
+        params["frame_result"] = numpy_backend.adaptive_mean_threshold(
+            img_blurred, 255, BLOCK_SIZE, 8
+        )
+        return params
+    img_binary = apply_tiled(
+        params,
+        lambda src, dst: cv2.adaptiveThreshold(
+            src,
+            255,
+            cv2.ADAPTIVE_THRESH_MEAN_C,
+            cv2.THRESH_BINARY,
+            blockSize=BLOCK_SIZE,
+            C=8,
+            dst=dst,
+        ),
         img_blurred,
-        255,
-        cv2.ADAPTIVE_THRESH_MEAN_C,
-        cv2.THRESH_BINARY,
-        blockSize=21,
-        C=8,
+        halo=BLOCK_SIZE // 2,
+        dst=get_buffer(params, "binarize_adaptive_mean_threshold", img_blurred.shape),
     )
     params["frame_result"] = img_binary
 
     return params
 
 
+@halo(BLUR_KSIZE // 2 + BLOCK_SIZE // 2)
 def binarize_adaptive_gauss_threshold(params):
     """
     Binarize by a adaptive gauss threshold. First, the image will be converted to grayscale and then a threshold will
     be used to create a binary image.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = "binarization (adaptive gauss threshold)"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
 
@@ -87,15 +104,26 @@ def binarize_adaptive_gauss_threshold(params):
     # If some more informations need to be passed to the next call of the same function, they can also be written
     # into the dictionary since they will only be overwritten when the algorithm changes.
 
-    img_grayscale = cv2.cvtColor(params["frame_curr"], cv2.COLOR_BGR2GRAY)
-    img_blurred = cv2.GaussianBlur(img_grayscale, (5, 5), 0)
-    img_binary = cv2.adaptiveThreshold(
+    img_blurred = get_blurred(params, BLUR_KSIZE)
+    if use_numpy_backend(params):
+        params["frame_result"] = numpy_backend.adaptive_gauss_threshold(
+            img_blurred, 255, BLOCK_SIZE, 8
+        )
+        return params
+    img_binary = apply_tiled(
+        params,
+        lambda src, dst: cv2.adaptiveThreshold(
+            src,
+            255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY,
+            blockSize=BLOCK_SIZE,
+            C=8,
+            dst=dst,
+        ),
         img_blurred,
-        255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY,
-        blockSize=21,
-        C=8,
+        halo=BLOCK_SIZE // 2,
+        dst=get_buffer(params, "binarize_adaptive_gauss_threshold", img_blurred.shape),
     )
     params["frame_result"] = img_binary
 
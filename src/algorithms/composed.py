@@ -0,0 +1,172 @@
+import cv2
+
+from algorithms.dense_optical_flow import (
+    DEFAULT_LEVELS,
+    DEFAULT_SCALE,
+    FARNEBACK_PARAMS,
+    visualize_flow,
+)
+from algorithms.edge_detection import SOBEL_KSIZE
+from algorithms.frame_products import get_blurred, get_grayscale
+
+
+# The separators of a pipeline description like "gray|blur:5|threshold:127".
+STAGE_SEPARATOR = "|"
+ARGUMENT_SEPARATOR = ":"
+
+# The kernel sizes cv2.Sobel supports.
+SOBEL_KSIZES = (1, 3, 5, 7)
+
+
+def gray(img):
+    return img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def blur(img, ksize=5):
+    return cv2.GaussianBlur(img, (ksize, ksize), 0)
+
+
+def threshold(img, thresh=127):
+    return cv2.threshold(gray(img), thresh, 255, cv2.THRESH_BINARY)[1]
+
+
+def sobel(img, direction="xy", ksize=SOBEL_KSIZE):
+    return cv2.Sobel(
+        gray(img),
+        ddepth=cv2.CV_8U,
+        dx=1 if "x" in direction else 0,
+        dy=1 if "y" in direction else 0,
+        ksize=ksize,
+    )
+
+
+def canny(img, low=100, high=200):
+    return cv2.Canny(gray(img), threshold1=low, threshold2=high)
+
+
+def flow(img_prev, img_curr, scale=DEFAULT_SCALE):
+    """
+    The dense optical flow (farneback) between the outputs of the previous stage for the previous and the current
+    frame, computed at the given scale.
+    """
+    height, width = img_curr.shape[:2]
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    img_prev = cv2.resize(gray(img_prev), size, interpolation=cv2.INTER_AREA)
+    img_curr = cv2.resize(gray(img_curr), size, interpolation=cv2.INTER_AREA)
+    flow_field = cv2.calcOpticalFlowFarneback(
+        img_prev, img_curr, None, levels=DEFAULT_LEVELS, flags=0, **FARNEBACK_PARAMS
+    )
+    return cv2.resize(visualize_flow(flow_field), (width, height))
+
+
+# The available stages: the function and the types of its (optional) arguments. The flow stage gets the output of
+# the previous stage for the previous and the current frame.
+STAGES = {
+    "gray": (gray, ()),
+    "blur": (blur, (int,)),
+    "threshold": (threshold, (int,)),
+    "sobel": (sobel, (str, int)),
+    "canny": (canny, (int, int)),
+    "flow": (flow, (float,)),
+}
+FLOW_STAGE = "flow"
+
+
+def parse_stage(description):
+    """
+    Parses a stage like "blur:5" and returns (name, arguments), the arguments that are not given are filled in with
+    their default values. Raises a ValueError if the stage is invalid.
+    """
+    name, *arguments = [part.strip() for part in description.split(ARGUMENT_SEPARATOR)]
+    if name not in STAGES:
+        raise ValueError(
+            f"unknown stage '{name}', the available stages are: {', '.join(STAGES)}"
+        )
+    function, types = STAGES[name]
+    if len(arguments) > len(types):
+        raise ValueError(f"the stage '{name}' takes at most {len(types)} arguments")
+    try:
+        arguments = tuple(
+            argument_type(argument) for argument_type, argument in zip(types, arguments)
+        )
+    except ValueError:
+        raise ValueError(f"invalid arguments for the stage '{name}': {description}")
+    arguments += function.__defaults__[len(arguments) :] if function.__defaults__ else ()
+
+    # Check the arguments now and not when the first frame arrives.
+    if name == "blur" and (arguments[0] <= 0 or arguments[0] % 2 == 0):
+        raise ValueError("the kernel size of the stage 'blur' has to be odd and positive")
+    if name == "sobel" and arguments[1] not in SOBEL_KSIZES:
+        raise ValueError(
+            f"the kernel size of the stage 'sobel' has to be one of {', '.join(map(str, SOBEL_KSIZES))}"
+        )
+    if name == "sobel" and arguments[0] not in ("x", "y", "xy"):
+        raise ValueError("the direction of the stage 'sobel' has to be x, y or xy")
+    if name == "flow" and not 0 < arguments[0] <= 1:
+        raise ValueError("the scale of the stage 'flow' has to be in (0, 1]")
+    return name, arguments
+
+
+class ComposedAlgorithm:
+    """
+    An algorithm composed of stages declared by a description like "gray|blur:5|threshold:127", every stage
+    processes the output of the previous one.
+    The output of every prefix of the pipeline is put into the frame cache, so pipelines (and mosaic tiles) that
+    start with the same stages compute them only once, and the "gray" and "gray|blur:k" prefixes are shared with the
+    built-in algorithms. The flow stage takes the output of the previous stages for the previous frame from the
+    frame cache as well, where it was carried forward from the last frame.
+    This is a class and not a function, so that it can be pickled for the worker processes.
+    """
+
+    def __init__(self, description):
+        self.stages = [
+            parse_stage(stage) for stage in description.split(STAGE_SEPARATOR)
+        ]
+        if [name for name, _ in self.stages].count(FLOW_STAGE) > 1:
+            raise ValueError("a pipeline can contain only one flow stage")
+        # The descriptions of all prefixes, with all default arguments filled in, e.g. "gray" and "gray|blur:5".
+        self.prefixes = []
+        for idx in range(len(self.stages)):
+            self.prefixes.append(
+                STAGE_SEPARATOR.join(
+                    ARGUMENT_SEPARATOR.join([name] + [str(argument) for argument in arguments])
+                    for name, arguments in self.stages[: idx + 1]
+                )
+            )
+        self.name = f"pipeline ({self.prefixes[-1]})"
+
+    def __call__(self, params):
+        params["frame_result"] = self.__compute(params, len(self.stages), "frame_curr")
+        return params
+
+    def __compute(self, params, stages, frame_key):
+        """
+        Returns the output of the first stages of the pipeline for the given frame.
+        """
+        if stages == 0:
+            return params[frame_key]
+        prefix = self.prefixes[stages - 1]
+        name, arguments = self.stages[stages - 1]
+        # These prefixes are the same products the built-in algorithms use.
+        if prefix == "gray":
+            return get_grayscale(params, frame_key)
+        if stages == 2 and self.prefixes[0] == "gray" and name == "blur":
+            return get_blurred(params, arguments[0], frame_key)
+
+        function, _ = STAGES[name]
+
+        def compute(entry=None):
+            if name == FLOW_STAGE:
+                return function(
+                    self.__compute(params, stages - 1, "frame_prev"),
+                    self.__compute(params, stages - 1, "frame_curr"),
+                    *arguments,
+                )
+            return function(self.__compute(params, stages - 1, frame_key), *arguments)
+
+        frame_cache = params.get("frame_cache")
+        if frame_cache is None:
+            return compute()
+        return frame_cache.get(
+            ("pipeline", prefix), compute, 1 if frame_key == "frame_prev" else 0
+        )
@@ -1,19 +1,32 @@
 import cv2
+import numpy as np
+
+from algorithms import numpy_backend
+from algorithms.frame_products import get_buffer, get_grayscale, use_numpy_backend
+
+
+# The size of the neighborhood over which the gradients are summed.
+BLOCK_SIZE = 2
+
+# The size of the kernel of the sobel operator computing the gradients.
+SOBEL_KSIZE = 3
+
+# The free parameter of the harris detector (typically between 0.04 and 0.06).
+HARRIS_K = 0.04
+
+# A pixel is marked as corner if its response is larger than this fraction of the strongest response in the frame.
+CORNER_THRESHOLD = 0.01
+
+# The color the corners are marked with (BGR).
+CORNER_COLOR = (0, 0, 255)
 
 
 def harris(params):
     """
     Finds corners based on the harris corner detection algorithm.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = "corner detection (harris)"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
 
@@ -21,6 +34,27 @@ def harris(params):
     # If some more informations need to be passed to the next call of the same function, they can also be written
     # into the dictionary since they will only be overwritten when the algorithm changes.
 
-    params["frame_result"] = params["frame_curr"]
+    img_gray = get_grayscale(params)
+    if use_numpy_backend(params):
+        response = numpy_backend.harris(img_gray, BLOCK_SIZE, SOBEL_KSIZE, HARRIS_K)
+    else:
+        response = cv2.cornerHarris(
+            img_gray,
+            BLOCK_SIZE,
+            SOBEL_KSIZE,
+            HARRIS_K,
+            dst=get_buffer(params, "harris_response", img_gray.shape, np.float32),
+        )
+
+    # Mark the corners in the current frame. The threshold depends on the strongest response of the whole frame, so
+    # the algorithm cannot be applied to parts of the frame (it has no halo).
+    frame_curr = params["frame_curr"]
+    frame_result = get_buffer(params, "harris", frame_curr.shape)
+    if frame_result is None:
+        frame_result = frame_curr.copy()
+    else:
+        np.copyto(frame_result, frame_curr)
+    frame_result[response > CORNER_THRESHOLD * response.max()] = CORNER_COLOR
+    params["frame_result"] = frame_result
 
     return params
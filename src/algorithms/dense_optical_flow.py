@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+
+from algorithms.frame_products import get_buffer, get_scaled
+from algorithms.properties import get_setting
+
+
+# The flow is computed at a downscaled resolution, dense flow at full resolution is far too slow for live use.
+DEFAULT_SCALE = 0.25
+
+# The number of pyramid levels used by the farneback algorithm (in addition to the image itself).
+DEFAULT_LEVELS = 3
+
+# Parameters for the farneback optical flow.
+FARNEBACK_PARAMS = dict(
+    pyr_scale=0.5, winsize=15, iterations=3, poly_n=5, poly_sigma=1.2
+)
+
+
+def dense_optical_flow(params):
+    """
+    This function computes the dense optical flow (farneback) between the previous and current frame and visualizes
+    it in HSV: the hue is the direction and the brightness the magnitude of the motion.
+    The flow is computed at the scale given by the setting "dense_flow_scale". The scaled previous frame is taken
+    from the frame cache (it was the current frame of the last call) and the flow of the last call is used as the
+    initial flow.
+    """
+    # The params dictionary contains at least the following entries:
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
+    # - frame_prev (some functions may need the previous frame too)
+    # - frame_curr (the current frame that most functions will process)
+
+    # The task of this function is to set the entry "frame_result".
+    # If some more informations need to be passed to the next call of the same function, they can also be written
+    # into the dictionary since they will only be overwritten when the algorithm changes.
+
+    scale = get_setting(params, "dense_flow_scale", DEFAULT_SCALE)
+    levels = get_setting(params, "dense_flow_levels", DEFAULT_LEVELS)
+    img_prev = get_scaled(params, scale, "frame_prev")
+    img_curr = get_scaled(params, scale)
+
+    # Start from the flow of the last call, the motion usually does not change much from frame to frame.
+    flow = params.get("flow")
+    flags = 0
+    if flow is not None and flow.shape[:2] == img_curr.shape[:2]:
+        flags = cv2.OPTFLOW_USE_INITIAL_FLOW
+    else:
+        flow = None
+    flow = cv2.calcOpticalFlowFarneback(
+        img_prev,
+        img_curr,
+        flow,
+        levels=levels,
+        flags=flags,
+        **FARNEBACK_PARAMS,
+    )
+    params["flow"] = flow
+
+    # Visualize the flow at the scaled resolution and upsample only the visualization.
+    img_hsv = params.get("img_hsv")
+    if img_hsv is None or img_hsv.shape[:2] != img_curr.shape[:2]:
+        img_hsv = params["img_hsv"] = np.full(
+            (img_curr.shape[0], img_curr.shape[1], 3), 255, dtype=np.uint8
+        )
+    img_bgr = visualize_flow(flow, img_hsv)
+
+    height, width = params["frame_curr"].shape[:2]
+    params["frame_result"] = cv2.resize(
+        img_bgr,
+        (width, height),
+        dst=get_buffer(params, "dense_optical_flow", (height, width, 3)),
+        interpolation=cv2.INTER_LINEAR,
+    )
+
+    return params
+
+
+def visualize_flow(flow, img_hsv=None):
+    """
+    Returns the flow as BGR image: the hue is the direction and the brightness the magnitude of the motion.
+    img_hsv is used as buffer for the HSV image if given, it has to be filled with 255 (the saturation).
+    """
+    if img_hsv is None:
+        img_hsv = np.full((flow.shape[0], flow.shape[1], 3), 255, dtype=np.uint8)
+    magnitude, angle = cv2.cartToPolar(flow[..., 0], flow[..., 1], angleInDegrees=True)
+    img_hsv[..., 0] = angle / 2
+    img_hsv[..., 2] = cv2.normalize(magnitude, None, 0, 255, cv2.NORM_MINMAX)
+    return cv2.cvtColor(img_hsv, cv2.COLOR_HSV2BGR)
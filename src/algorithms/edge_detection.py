@@ -1,6 +1,22 @@
 import cv2
 from enum import Enum
 
+from algorithms import numpy_backend
+from algorithms.frame_products import (
+    apply_tiled,
+    get_blurred,
+    get_buffer,
+    use_numpy_backend,
+)
+from algorithms.properties import halo
+
+
+# The size of the kernel of the sobel operator.
+SOBEL_KSIZE = 5
+
+# The size of the kernel of the blur applied before the edge detection.
+BLUR_KSIZE = 3
+
 
 class SobelDirection(Enum):
     X = 1
@@ -16,14 +32,17 @@ class SobelDirection(Enum):
             return "xy"
 
 
+@halo(BLUR_KSIZE // 2 + SOBEL_KSIZE // 2)
 def sobel_x(params):
     return sobel(params, SobelDirection.X)
 
 
+@halo(BLUR_KSIZE // 2 + SOBEL_KSIZE // 2)
 def sobel_y(params):
     return sobel(params, SobelDirection.Y)
 
 
+@halo(BLUR_KSIZE // 2 + SOBEL_KSIZE // 2)
 def sobel_xy(params):
     return sobel(params, SobelDirection.XY)
 
@@ -32,15 +51,8 @@ def sobel(params, direction):
     """
     Performs edge detection based on the Sobel algorithm in the given direction.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = f"edge detection (sobel {str(direction)}-direction)"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
 
@@ -48,14 +60,28 @@ def sobel(params, direction):
     # If some more informations need to be passed to the next call of the same function, they can also be written
     # into the dictionary since they will only be overwritten when the algorithm changes.
 
-    img_grayscale = cv2.cvtColor(params["frame_curr"], cv2.COLOR_BGR2GRAY)
-    img_blurred = cv2.GaussianBlur(img_grayscale, (3, 3), 0)
-    params["frame_result"] = cv2.Sobel(
+    img_blurred = get_blurred(params, BLUR_KSIZE)
+    if use_numpy_backend(params):
+        params["frame_result"] = numpy_backend.sobel(
+            img_blurred,
+            1 if direction == SobelDirection.X or direction == SobelDirection.XY else 0,
+            1 if direction == SobelDirection.Y or direction == SobelDirection.XY else 0,
+            SOBEL_KSIZE,
+        )
+        return params
+    params["frame_result"] = apply_tiled(
+        params,
+        lambda src, dst: cv2.Sobel(
+            src,
+            ddepth=cv2.CV_8U,
+            dx=1 if direction == SobelDirection.X or direction == SobelDirection.XY else 0,
+            dy=1 if direction == SobelDirection.Y or direction == SobelDirection.XY else 0,
+            ksize=SOBEL_KSIZE,
+            dst=dst,
+        ),
         img_blurred,
-        ddepth=cv2.CV_8U,
-        dx=1 if direction == SobelDirection.X or direction == SobelDirection.XY else 0,
-        dy=1 if direction == SobelDirection.Y or direction == SobelDirection.XY else 0,
-        ksize=5,
+        halo=SOBEL_KSIZE // 2,
+        dst=get_buffer(params, f"sobel_{str(direction)}", img_blurred.shape),
     )
 
     return params
@@ -64,16 +90,11 @@ def sobel(params, direction):
 def canny(params):
     """
     Performs edge detection based on the Canny algorithm.
+    Its hysteresis follows a weak edge over any distance to a strong one, so a change can alter edges far away from
+    it. The algorithm has no halo and is always applied to the full frame.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = "edge detection (canny)"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
 
@@ -81,8 +102,12 @@ def canny(params):
     # If some more informations need to be passed to the next call of the same function, they can also be written
     # into the dictionary since they will only be overwritten when the algorithm changes.
 
-    img_grayscale = cv2.cvtColor(params["frame_curr"], cv2.COLOR_BGR2GRAY)
-    img_blurred = cv2.GaussianBlur(img_grayscale, (3, 3), 0)
-    params["frame_result"] = cv2.Canny(img_blurred, threshold1=100, threshold2=200)
+    img_blurred = get_blurred(params, BLUR_KSIZE)
+    params["frame_result"] = cv2.Canny(
+        img_blurred,
+        threshold1=100,
+        threshold2=200,
+        edges=get_buffer(params, "canny", img_blurred.shape),
+    )
 
     return params
@@ -0,0 +1,117 @@
+import cv2
+import numpy as np
+
+from algorithms import numpy_backend
+from algorithms.properties import get_setting
+
+
+# The products derived from the frames and the buffers for the results are requested through these functions. If
+# the image processor put a frame cache into the params dictionary, the products are shared between the algorithms
+# and carried forward to the next frame. Otherwise (e.g. in the worker processes of the parallel executor) they are
+# simply computed.
+# If the setting "backend" is "numpy", the grayscale and blurred images are computed by the NumPy implementations
+# (see numpy_backend) and cached separately from the ones computed by OpenCV.
+
+
+def use_numpy_backend(params):
+    """
+    Returns whether the algorithms shall use the NumPy implementations of the OpenCV functions (see numpy_backend).
+    """
+    return get_setting(params, "backend", "opencv") == "numpy"
+
+
+def get_grayscale(params, frame_key="frame_curr"):
+    """
+    Returns the grayscale image of the current frame (or of the previous frame if frame_key is "frame_prev").
+    """
+    frame_cache = params.get("frame_cache")
+    if use_numpy_backend(params):
+        if frame_cache is not None:
+            return frame_cache.get(
+                ("numpy", "gray"),
+                lambda entry: numpy_backend.grayscale(entry.frame),
+                _get_age(frame_key),
+            )
+        return numpy_backend.grayscale(params[frame_key])
+    if frame_cache is not None:
+        return frame_cache.get_gray(age=_get_age(frame_key))
+    return cv2.cvtColor(params[frame_key], cv2.COLOR_BGR2GRAY)
+
+
+def get_blurred(params, ksize, frame_key="frame_curr"):
+    """
+    Returns the grayscale image blurred by a gaussian kernel of the size ksize x ksize.
+    """
+    frame_cache = params.get("frame_cache")
+    if use_numpy_backend(params):
+        if frame_cache is not None:
+            return frame_cache.get(
+                ("numpy", "blurred", ksize),
+                lambda entry: numpy_backend.gaussian_blur(
+                    get_grayscale(params, frame_key), ksize
+                ),
+                _get_age(frame_key),
+            )
+        return numpy_backend.gaussian_blur(get_grayscale(params, frame_key), ksize)
+    if frame_cache is not None:
+        return frame_cache.get_blurred(ksize, age=_get_age(frame_key))
+    return cv2.GaussianBlur(get_grayscale(params, frame_key), (ksize, ksize), 0)
+
+
+def get_scaled(params, scale, frame_key="frame_curr"):
+    """
+    Returns the grayscale image scaled by the given factor.
+    """
+    frame_cache = params.get("frame_cache")
+    if frame_cache is not None:
+        return frame_cache.get_scaled(scale, age=_get_age(frame_key))
+    img = get_grayscale(params, frame_key)
+    if scale == 1:
+        return img
+    height, width = img.shape[:2]
+    return cv2.resize(
+        img,
+        (max(1, round(width * scale)), max(1, round(height * scale))),
+        interpolation=cv2.INTER_AREA,
+    )
+
+
+def get_pyramid(params, levels, frame_key="frame_curr"):
+    """
+    Returns the gaussian pyramid of the grayscale image as a list, starting with the grayscale image itself.
+    """
+    frame_cache = params.get("frame_cache")
+    if frame_cache is not None:
+        return frame_cache.get_pyramid(levels, age=_get_age(frame_key))
+    pyramid = [get_grayscale(params, frame_key)]
+    for _ in range(levels):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+    return pyramid
+
+
+def get_buffer(params, name, shape, dtype=np.uint8):
+    """
+    Returns a reusable buffer with the given name for the result of an algorithm, so that it does not need to be
+    allocated for every frame. Pass it to the dst argument of the OpenCV functions. If there is no buffer pool,
+    None is returned and OpenCV allocates the result as usual.
+    """
+    buffer_pool = params.get("buffer_pool")
+    if buffer_pool is None:
+        return None
+    return buffer_pool.get(name, shape, dtype)
+
+
+def apply_tiled(params, function, src, halo, dst=None):
+    """
+    Applies function(src, dst) to the image. If the image processor put a tiled executor into the params
+    dictionary, the image is split into strips that are processed in parallel, halo has to be at least the radius
+    of the kernel of the function then (see TiledExecutor).
+    """
+    tiled_executor = params.get("tiled_executor")
+    if tiled_executor is None:
+        return function(src, dst)
+    return tiled_executor.apply(function, src, halo, dst)
+
+
+def _get_age(frame_key):
+    return 1 if frame_key == "frame_prev" else 0
@@ -0,0 +1,183 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Vectorized NumPy implementations of the OpenCV functions used by the algorithms. They are used instead of OpenCV if
+# the setting "backend" is "numpy" (see the '--backend' argument) and serve as a reference of what the OpenCV
+# functions compute. They follow the conventions of OpenCV (kernels, borders and rounding), so their results agree
+# with OpenCV up to rounding differences (see 'python src/benchmark.py --backends').
+
+# OpenCV converts BGR to grayscale with the weights of BT.601 in 14 bit fixed point.
+GRAY_WEIGHTS_SHIFT = 14
+GRAY_WEIGHTS_BGR = (1868, 9617, 4899)
+
+# OpenCV uses these fixed gaussian kernels for the small kernel sizes if no sigma is given.
+SMALL_GAUSSIAN_KERNELS = {
+    1: [1.0],
+    3: [0.25, 0.5, 0.25],
+    5: [0.0625, 0.25, 0.375, 0.25, 0.0625],
+    7: [0.03125, 0.109375, 0.21875, 0.28125, 0.21875, 0.109375, 0.03125],
+}
+
+# The modes of np.pad that extend the border like OpenCV's BORDER_REFLECT_101 (the default of most filters) and
+# BORDER_REPLICATE.
+BORDER_REFLECT_101 = "reflect"
+BORDER_REPLICATE = "edge"
+
+
+def grayscale(img):
+    """
+    Converts the BGR image to a grayscale image.
+    """
+    img_gray = np.full(img.shape[:2], 1 << (GRAY_WEIGHTS_SHIFT - 1), dtype=np.uint32)
+    for channel, weight in enumerate(GRAY_WEIGHTS_BGR):
+        # The product is computed in uint32, the uint8 channel would overflow (NumPy 1.x keeps the type of the array).
+        img_gray += np.multiply(img[..., channel], weight, dtype=np.uint32)
+    img_gray >>= GRAY_WEIGHTS_SHIFT
+    return img_gray.astype(np.uint8)
+
+
+def gaussian_kernel(ksize, sigma=0):
+    """
+    Returns the 1D gaussian kernel of the given size. If sigma is not positive, it is derived from the size like
+    OpenCV does.
+    """
+    if sigma <= 0 and ksize in SMALL_GAUSSIAN_KERNELS:
+        return np.array(SMALL_GAUSSIAN_KERNELS[ksize], dtype=np.float32)
+    if sigma <= 0:
+        sigma = 0.3 * ((ksize - 1) * 0.5 - 1) + 0.8
+    x = np.arange(ksize) - (ksize - 1) / 2
+    kernel = np.exp(-(x**2) / (2 * sigma**2))
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def sobel_kernel(order, ksize):
+    """
+    Returns the 1D kernel of the sobel operator of the given size for the given order of the derivative (0 for the
+    smoothing kernel, 1 for the derivative kernel).
+    """
+    kernel = np.array([1.0], dtype=np.float32)
+    for _ in range(ksize - 1 - 2 * order):
+        kernel = np.convolve(kernel, [1, 1])
+    if order == 1:
+        kernel = np.convolve(kernel, [-1, 0, 1])
+    return kernel.astype(np.float32)
+
+
+def correlate_separable(img, kernel_x, kernel_y, border=BORDER_REFLECT_101):
+    """
+    Correlates the image with the kernel_y along the columns and with the kernel_x along the rows (like
+    cv2.sepFilter2D) and returns the result as float32 image.
+    """
+    radius_y, radius_x = len(kernel_y) // 2, len(kernel_x) // 2
+    padded = np.pad(img, ((radius_y, radius_y), (radius_x, radius_x)), mode=border)
+    # Every tap of the kernel is a shifted view of the padded image (see sliding_window_view), so every tap is a
+    # single vectorized multiply-add over the whole image.
+    rows = _correlate_axis(padded.astype(np.float32, copy=False), kernel_y, axis=0)
+    return _correlate_axis(rows, kernel_x, axis=1)
+
+
+def gaussian_blur(img, ksize, border=BORDER_REFLECT_101):
+    """
+    Blurs the image by a gaussian kernel of the size ksize x ksize (like cv2.GaussianBlur with sigma 0).
+    """
+    kernel = gaussian_kernel(ksize)
+    return _saturate_uint8(correlate_separable(img, kernel, kernel, border))
+
+
+def threshold(img, thresh, maxval):
+    """
+    Sets all pixels above the threshold to maxval and all others to 0 (like cv2.threshold with THRESH_BINARY).
+    """
+    return np.where(img > thresh, np.uint8(maxval), np.uint8(0))
+
+
+def box_sum(img, ksize, border=BORDER_REFLECT_101):
+    """
+    Returns the sums of all ksize x ksize neighborhoods of the image (like cv2.boxFilter without normalization),
+    computed from the integral image with four lookups per pixel, independent of the kernel size.
+    """
+    # Like OpenCV, the anchor of an even kernel is the pixel right of / below its center.
+    before = ksize // 2
+    after = ksize - 1 - before
+    padded = np.pad(img, ((before, after), (before, after)), mode=border)
+    dtype = np.float64 if np.issubdtype(img.dtype, np.floating) else np.int64
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=dtype)
+    np.cumsum(padded, axis=0, dtype=dtype, out=integral[1:, 1:])
+    np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+    height, width = img.shape[:2]
+    return (
+        integral[ksize : ksize + height, ksize : ksize + width]
+        - integral[:height, ksize : ksize + width]
+        - integral[ksize : ksize + height, :width]
+        + integral[:height, :width]
+    )
+
+
+def adaptive_mean_threshold(img, maxval, block_size, c):
+    """
+    Sets all pixels above the mean of their block_size x block_size neighborhood minus c to maxval and all others
+    to 0 (like cv2.adaptiveThreshold with ADAPTIVE_THRESH_MEAN_C and THRESH_BINARY).
+    """
+    img_mean = _saturate_uint8(box_sum(img, block_size, BORDER_REPLICATE) / block_size**2)
+    return _adaptive_threshold(img, img_mean, maxval, c)
+
+
+def adaptive_gauss_threshold(img, maxval, block_size, c):
+    """
+    Sets all pixels above the gaussian weighted mean of their block_size x block_size neighborhood minus c to maxval
+    and all others to 0 (like cv2.adaptiveThreshold with ADAPTIVE_THRESH_GAUSSIAN_C and THRESH_BINARY).
+    """
+    img_mean = gaussian_blur(img, block_size, BORDER_REPLICATE)
+    return _adaptive_threshold(img, img_mean, maxval, c)
+
+
+def sobel(img, dx, dy, ksize):
+    """
+    Returns the derivative of the given orders of the image, saturated to uint8 (like cv2.Sobel with ddepth
+    CV_8U).
+    """
+    return _saturate_uint8(
+        correlate_separable(img, sobel_kernel(dx, ksize), sobel_kernel(dy, ksize))
+    )
+
+
+def harris(img, block_size, ksize, k):
+    """
+    Returns the response of the harris corner detector (like cv2.cornerHarris): det(M) - k * trace(M)^2, where M
+    is the sum of the products of the gradients over the block_size x block_size neighborhood.
+    """
+    # OpenCV scales the gradients, so that the response does not depend on the kernel sizes.
+    scale = 1 / ((1 << (ksize - 1)) * block_size)
+    if img.dtype == np.uint8:
+        scale /= 255
+    smooth, deriv = sobel_kernel(0, ksize) * scale, sobel_kernel(1, ksize)
+    img_dx = correlate_separable(img, deriv, smooth)
+    img_dy = correlate_separable(img, smooth, deriv)
+    sum_xx = box_sum(img_dx * img_dx, block_size)
+    sum_xy = box_sum(img_dx * img_dy, block_size)
+    sum_yy = box_sum(img_dy * img_dy, block_size)
+    response = sum_xx * sum_yy - sum_xy * sum_xy - k * (sum_xx + sum_yy) ** 2
+    return response.astype(np.float32)
+
+
+def _correlate_axis(img, kernel, axis):
+    """
+    Correlates the padded image with the 1D kernel along the given axis, the result is smaller by the size of the
+    kernel minus one along this axis.
+    """
+    windows = sliding_window_view(img, len(kernel), axis=axis)
+    result = windows[..., 0] * kernel[0]
+    for tap in range(1, len(kernel)):
+        if kernel[tap] != 0:
+            result += windows[..., tap] * kernel[tap]
+    return result
+
+
+def _adaptive_threshold(img, img_mean, maxval, c):
+    # OpenCV compares the integer difference with the rounded up constant.
+    return threshold(img.astype(np.int16) - img_mean, -np.ceil(c), maxval)
+
+
+def _saturate_uint8(img):
+    return np.clip(np.rint(img), 0, 255).astype(np.uint8)
@@ -1,21 +1,46 @@
 import cv2
 import numpy as np
 
+from algorithms.frame_products import get_buffer, get_grayscale
+
+
+# Parameters for the corner detection.
+FEATURE_PARAMS = dict(maxCorners=100, qualityLevel=0.3, minDistance=7, blockSize=7)
+
+# Parameters for the lucas kanade optical flow.
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+)
+
+# A track is rejected if tracking its new point back into the previous frame misses its old point by more than this
+# distance (in pixels).
+MAX_FORWARD_BACKWARD_ERROR = 1.0
+
+# If fewer tracks are left, new corners are detected in the regions without tracks. Since the detection is much
+# more expensive than the tracking, it runs at most every DETECTION_INTERVAL frames.
+MIN_TRACKS = 50
+DETECTION_INTERVAL = 15
+
+# The tracks are drawn in a small palette of colors, so that all tracks of one color can be drawn in one call.
+NUMBER_OF_COLORS = 8
+
+# The look of the tracks. The trails fade out by TRAIL_FADE per frame so that the mask does not fill up over time.
+LINE_THICKNESS = 2
+POINT_RADIUS = 5
+TRAIL_FADE = 2
+
 
 def optical_flow(params):
     """
     This function applies the optical flow algorithm to the previous and current frame.
     Within the params dictionary, further informations are written.
+    Tracks that fail the forward-backward check are dropped and new corners are detected automatically as soon as
+    there are too few tracks left.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = "optical flow"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
 
@@ -23,62 +48,117 @@ def optical_flow(params):
     # If some more informations need to be passed to the next call of the same function, they can also be written
     # into the dictionary since they will only be overwritten when the algorithm changes.
 
-    # params for corner detection
-    feature_params = dict(maxCorners=100, qualityLevel=0.3, minDistance=7, blockSize=7)
-
-    # Parameters for lucas kanade optical flow
-    lk_params = dict(
-        winSize=(15, 15),
-        maxLevel=2,
-        criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
-    )
-
     # Check if this is the first run for this algorithm.
     if "mask" not in params:
         # First run.
         params["mask"] = np.zeros_like(params["frame_curr"])
-        params["colors"] = np.random.randint(0, 255, (100, 3))
-        # Find corners in the current frame.
-        params["p0"] = cv2.goodFeaturesToTrack(
-            cv2.cvtColor(params["frame_prev"], cv2.COLOR_BGR2GRAY),
-            mask=None,
-            maxCorners=100,
-            qualityLevel=0.3,
-            minDistance=7,
-            blockSize=7,
-        )
+        params["colors"] = np.random.randint(0, 255, (NUMBER_OF_COLORS, 3))
+        params["p0"] = np.empty((0, 1, 2), dtype=np.float32)
+        params["track_colors"] = np.empty(0, dtype=np.int32)
+        params["next_color"] = 0
+        params["frames_since_detection"] = 0
+        # Find corners in the previous frame.
+        detect_features(params, "frame_prev")
         params["frame_result"] = params["frame_curr"]
-    else:
-        # This is not the first run, we can run optical flow on it.
-        p1, st, err = cv2.calcOpticalFlowPyrLK(
-            cv2.cvtColor(params["frame_prev"], cv2.COLOR_BGR2GRAY),
-            cv2.cvtColor(params["frame_curr"], cv2.COLOR_BGR2GRAY),
-            params["p0"],
-            None,
-            **lk_params,
+        return params
+
+    # This is not the first run, we can run optical flow on it.
+    p0 = params["p0"]
+    if len(p0) > 0:
+        img_prev = get_grayscale(params, "frame_prev")
+        img_curr = get_grayscale(params)
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(img_prev, img_curr, p0, None, **LK_PARAMS)
+        # Track the points back into the previous frame. Good tracks end up where they started.
+        p0r, st_back, _ = cv2.calcOpticalFlowPyrLK(
+            img_curr, img_prev, p1, None, **LK_PARAMS
         )
-        if p1 is not None:
-            good_new = p1[st == 1]
-            good_old = params["p0"][st == 1]
-            # draw the tracks
-            for i, (new, old) in enumerate(zip(good_new, good_old)):
-                a, b = new.ravel()
-                c, d = old.ravel()
-                params["mask"] = cv2.line(
-                    params["mask"],
-                    (int(a), int(b)),
-                    (int(c), int(d)),
-                    params["colors"][i].tolist(),
-                    2,
-                )
-                params["frame_curr"] = cv2.circle(
-                    params["frame_curr"],
-                    (int(a), int(b)),
-                    5,
-                    params["colors"][i].tolist(),
-                    -1,
-                )
-            params["p0"] = good_new.reshape(-1, 1, 2)
-        params["frame_result"] = cv2.add(params["frame_curr"], params["mask"])
+        error = np.abs(p0 - p0r).reshape(-1, 2).max(axis=1)
+        good = (st.ravel() == 1) & (st_back.ravel() == 1)
+        good &= error < MAX_FORWARD_BACKWARD_ERROR
+        good_old = p0[good].reshape(-1, 2)
+        params["p0"] = p1[good].reshape(-1, 1, 2)
+        params["track_colors"] = params["track_colors"][good]
+    else:
+        good_old = np.empty((0, 2), dtype=np.float32)
+
+    # Let the old trails fade out and draw the new segments of the tracks.
+    mask = params["mask"]
+    cv2.subtract(mask, (TRAIL_FADE, TRAIL_FADE, TRAIL_FADE, 0), dst=mask)
+    draw_segments(mask, params, good_old, LINE_THICKNESS)
+
+    # Draw the points onto the result and not onto the current frame, since the current frame may be used by
+    # other algorithms at the same time.
+    params["frame_result"] = cv2.add(
+        params["frame_curr"],
+        mask,
+        dst=get_buffer(params, "optical_flow", params["frame_curr"].shape),
+    )
+    draw_segments(params["frame_result"], params, None, 2 * POINT_RADIUS)
+
+    # Replace the lost tracks.
+    params["frames_since_detection"] += 1
+    if (
+        len(params["p0"]) < MIN_TRACKS
+        and params["frames_since_detection"] >= DETECTION_INTERVAL
+    ):
+        detect_features(params, "frame_curr")
 
     return params
+
+
+def draw_segments(img, params, points_old, thickness):
+    """
+    Draws the segments from the old to the current points of all tracks with one call per color. If no old points
+    are given, the segments have a length of zero, which draws the points as dots.
+    """
+    points_new = params["p0"].reshape(-1, 2)
+    segments = np.stack(
+        [points_old if points_old is not None else points_new, points_new], axis=1
+    )
+    segments = np.rint(segments).astype(np.int32)
+    for color_idx, color in enumerate(params["colors"]):
+        selected = segments[params["track_colors"] == color_idx]
+        if len(selected) > 0:
+            cv2.polylines(img, selected, False, color.tolist(), thickness)
+
+
+def detect_features(params, frame_key):
+    """
+    Detects new corners in the regions of the given frame that do not contain any tracks yet and adds them to the
+    tracks.
+    """
+    params["frames_since_detection"] = 0
+    img = get_grayscale(params, frame_key)
+    missing = FEATURE_PARAMS["maxCorners"] - len(params["p0"])
+    if missing <= 0:
+        return
+    # Mask out the surroundings of the existing tracks (drawn as thick dots in one call).
+    mask = get_buffer(params, "optical_flow_detection_mask", img.shape)
+    if mask is None:
+        mask = np.empty(img.shape, dtype=np.uint8)
+    mask.fill(255)
+    points = np.rint(params["p0"].reshape(-1, 2)).astype(np.int32)
+    if len(points) > 0:
+        cv2.polylines(
+            mask,
+            np.stack([points, points], axis=1),
+            False,
+            0,
+            2 * FEATURE_PARAMS["minDistance"],
+        )
+    p_new = cv2.goodFeaturesToTrack(
+        img,
+        mask=mask,
+        maxCorners=missing,
+        qualityLevel=FEATURE_PARAMS["qualityLevel"],
+        minDistance=FEATURE_PARAMS["minDistance"],
+        blockSize=FEATURE_PARAMS["blockSize"],
+    )
+    if p_new is None:
+        return
+    params["p0"] = np.concatenate([params["p0"], p_new.astype(np.float32)])
+    colors = (params["next_color"] + np.arange(len(p_new))) % NUMBER_OF_COLORS
+    params["track_colors"] = np.concatenate(
+        [params["track_colors"], colors.astype(np.int32)]
+    )
+    params["next_color"] = int(colors[-1] + 1) % NUMBER_OF_COLORS
@@ -2,18 +2,16 @@ def original(params):
     """
     This is a template for creating a new algorithm that can be used in the image processor class.
     For demonstration reasons, the input frame will not be converted but simply written to the output.
+    To make an algorithm available, add an entry with its name and properties to ALGORITHMS in
+    algorithms/__init__.py.
     """
-    # Add the name of the algorithm to the parameters.
-    params["algorithm_name"] = "original"
-
-    # Check if we really want to process an image or if we just wanted to receive the algorithm name.
-    if len(params) == 1:
-        return params
-
     # The params dictionary contains at least the following entries:
-    # - algorithm_name (as set before)
+    # - algorithm_name (the name declared in the registry, see algorithms/__init__.py)
     # - frame_prev (some functions may need the previous frame too)
     # - frame_curr (the current frame that most functions will process)
+    # - frame_cache (shares the grayscale, blurred, ... images between the algorithms, use the functions in
+    #   algorithms/frame_products.py instead of computing them on your own)
+    # - buffer_pool (reusable buffers for the results, see get_buffer in algorithms/frame_products.py)
 
     # The task of this function is to set the entry "frame_result".
     # If some more informations need to be passed to the next call of the same function, they can also be written
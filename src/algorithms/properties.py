@@ -0,0 +1,37 @@
+def is_stateful(function):
+    """
+    Returns True if the algorithm is declared as stateful in the registry (see Algorithm).
+    """
+    return getattr(function, "stateful", False)
+
+
+def halo(radius):
+    """
+    Marks a stateless algorithm whose result at a pixel only depends on the pixels within the given radius (the sum
+    of the radii of all its kernels). Such an algorithm can be applied to a part of the frame, extended by the
+    radius on all sides, with the same result (see IncrementalProcessor).
+    """
+
+    def decorator(function):
+        function.halo = radius
+        return function
+
+    return decorator
+
+
+def get_halo(function):
+    """
+    Returns the radius given by the halo decorator or None if the algorithm cannot be applied to a part of the
+    frame.
+    """
+    return getattr(function, "halo", None)
+
+
+def get_setting(params, name, default):
+    """
+    Returns the setting with the given name (e.g. given on the command line) or the default value of the algorithm.
+    """
+    settings = params.get("settings")
+    if settings is None or settings.get(name) is None:
+        return default
+    return settings[name]
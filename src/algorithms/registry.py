@@ -0,0 +1,43 @@
+import importlib
+
+
+class Algorithm:
+    """
+    An entry of the registry of the algorithms (see ALGORITHMS in algorithms/__init__.py). It declares the metadata
+    of an algorithm: its name, whether it is stateful (it keeps informations in the params dictionary from one frame
+    to the next, like the tracked points of the optical flow, so its frames cannot be processed independently of
+    each other) and the settings it reads (see get_setting in algorithms/properties.py).
+    The module of the algorithm is only imported when the algorithm is called for the first time, so the metadata of
+    all algorithms is available without importing OpenCV. Other attributes (like the halo) are looked up on the
+    function of the algorithm, which imports its module as well.
+    """
+
+    def __init__(self, name, module, function, stateful=False, parameters=()):
+        self.name = name
+        self.module = module
+        self.function_name = function
+        self.stateful = stateful
+        self.parameters = tuple(parameters)
+        self.function = None
+
+    def load(self):
+        """
+        Imports the module of the algorithm (if not done yet) and returns the function of the algorithm.
+        """
+        if self.function is None:
+            self.function = getattr(importlib.import_module(self.module), self.function_name)
+        return self.function
+
+    def __call__(self, params):
+        return self.load()(params)
+
+    def __getattr__(self, name):
+        # This is only called for the attributes the entry does not have. The special attributes are not delegated,
+        # e.g. pickle looks them up before the entry is initialized.
+        if name.startswith("__") or "function_name" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __getstate__(self):
+        # The function is looked up again in the worker processes.
+        return dict(self.__dict__, function=None)
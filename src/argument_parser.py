@@ -1,4 +1,5 @@
 import argparse
+import os
 
 
 def get_argument_parser():
@@ -20,16 +21,259 @@ def get_argument_parser():
         "-d",
         "--device-id",
         dest="device_id",
-        help="the id of the camera that shall be used (if you want to use a video, see the '-f' argument)",
-        default=1,
+        help="the ids of the cameras that shall be used, every camera is processed in its own pipeline (if neither a camera nor a video is given, the camera 1 is used)",
+        default=None,
+        nargs="+",
         type=int,
     )
     parser.add_argument(
         "-f",
         "--filename-video",
         dest="filename_video",
-        help="path to the video that shall be processed (if not set, the camera stream will be used)",
+        help="paths to the videos that shall be processed, every video is processed in its own pipeline (if not set, the camera stream will be used)",
+        default=None,
+        nargs="+",
+    )
+    parser.add_argument(
+        "--capture-policy",
+        dest="capture_policy",
+        help="how frames are buffered if the processing is slower than the source: 'latest' drops old frames, 'lossless' keeps all of them (if not set, 'latest' is used for the camera and 'lossless' for videos)",
+        choices=["latest", "lossless"],
+        default=None,
+    )
+    parser.add_argument(
+        "--capture-buffer-size",
+        dest="capture_buffer_size",
+        help="the maximum number of captured frames waiting to be processed",
+        default=4,
+        type=int,
+    )
+    parser.add_argument(
+        "--camera-width",
+        dest="camera_width",
+        help="the frame width requested from the cameras (if not set, the default of the driver is used, the negotiated values are shown in the terminal UI)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--camera-height",
+        dest="camera_height",
+        help="the frame height requested from the cameras (if not set, the default of the driver is used)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--camera-fps",
+        dest="camera_fps",
+        help="the FPS requested from the cameras (if not set, the default of the driver is used)",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--camera-fourcc",
+        dest="camera_fourcc",
+        help="the FOURCC code of the pixel format requested from the cameras, e.g. 'MJPG' (if not set, the default of the driver is used, often the uncompressed 'YUYV' with a low FPS at high resolutions)",
+        default=None,
+        type=fourcc,
+    )
+    parser.add_argument(
+        "--camera-buffer-size",
+        dest="camera_buffer_size",
+        help="the number of frames buffered by the driver of the cameras (CAP_PROP_BUFFERSIZE, 1 gives the lowest latency, not supported by every backend)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--measure-capture",
+        dest="measure_capture",
+        help="if set, this number of frames is grabbed from every source without processing them, the negotiated camera settings, the intervals between the grab() calls and the effective FPS are reported, afterwards the program will be aborted (works with a video given by '-f' too)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--pacing",
+        dest="pacing",
+        help="how the frame rate is paced: 'source' matches the FPS of the source, 'unlimited' runs as fast as possible, 'target' holds the FPS given by '--target-fps' (if not set, 'source' is used for the camera and 'unlimited' for videos)",
+        choices=["source", "unlimited", "target"],
+        default=None,
+    )
+    parser.add_argument(
+        "--target-fps",
+        dest="target_fps",
+        help="the FPS that shall be held if the pacing is set to 'target'",
+        default=30,
+        type=float,
+    )
+    parser.add_argument(
+        "--display-fps",
+        dest="display_fps",
+        help="the maximum FPS at which the frames are shown in the windows, independent of the FPS at which they are processed (if not set, every processed frame is shown)",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--latency-budget",
+        dest="latency_budget",
+        help="the time in ms the processing of a frame may take, if it takes longer the frames are processed at a lower resolution (if not set, the frames are always processed at full resolution)",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--static-tolerance",
+        dest="static_tolerance",
+        help="if set, a frame is not processed again by stateless algorithms if the gray levels of its thumbnail differ by at most this value from the last processed frame, the last result is reused instead",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--incremental-tolerance",
+        dest="incremental_tolerance",
+        help="if set, the algorithms that support it (grayscale, binarization, sobel) only process the tiles of the frame in which a pixel changed by more than this value since the last frame",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--tile-threads",
+        dest="tile_threads",
+        help="the number of threads the neighborhood filters (blur, adaptive threshold, sobel) are split across, each thread processes a strip of the frame (if not set, the filters are not split)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--dense-flow-scale",
+        dest="dense_flow_scale",
+        help="the scale of the frames the dense optical flow is computed at (the result is upsampled again)",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--dense-flow-levels",
+        dest="dense_flow_levels",
+        help="the number of pyramid levels used by the dense optical flow",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--backend",
+        dest="backend",
+        help="the implementation of the image processing functions: 'opencv' or the vectorized NumPy reference implementations 'numpy' (grayscale, blur, thresholds, sobel and harris, the other functions always use OpenCV)",
+        choices=["opencv", "numpy"],
+        default=None,
+    )
+    parser.add_argument(
+        "--loop-cache-mb",
+        dest="loop_cache_mb",
+        help="if set, the decoded frames of a video are kept (up to this many MB) and replayed when the video loops instead of decoding it again",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--loop-cache-file",
+        dest="loop_cache_file",
+        help="path to a raw frame file the frames of the loop cache are memory-mapped to instead of keeping them in memory (useful for longer videos, the file is removed at the end)",
+        default=None,
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        help="the number of threads of the worker pool shared by the pipelines of all sources (if not set, one per source up to the number of CPUs)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--pipeline",
+        dest="pipelines",
+        help="algorithms composed of stages, e.g. 'gray|blur:5|threshold:127', which are added after the built-in algorithms (available stages: gray, blur:ksize, threshold:thresh, sobel:direction:ksize, canny:low:high, flow:scale)",
+        nargs="+",
+        default=None,
+    )
+    parser.add_argument(
+        "--mosaic",
+        dest="mosaic",
+        help="the indices of several algorithms that shall run on the same frame at the same time, their results are shown in one mosaic",
+        nargs="+",
         default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--trace-file",
+        dest="trace_file",
+        help="path to a CSV or JSON file (depending on the extension) the durations of the stages of every frame are written to when the program ends",
+        default=None,
+    )
+    parser.add_argument(
+        "--mjpeg-port",
+        dest="mjpeg_port",
+        help="if set, the processed frames are served as MJPEG stream on this port of localhost (http://localhost:<port>/stream.mjpg, with several sources /stream/<idx>.mjpg)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--record-original",
+        dest="record_original",
+        help="path to a video the original frames are recorded to while running (with several sources, the index of the source is appended to the name)",
+        default=None,
+    )
+    parser.add_argument(
+        "--record-processed",
+        dest="record_processed",
+        help="path to a video the processed frames are recorded to while running (with several sources, the index of the source is appended to the name)",
+        default=None,
+    )
+    parser.add_argument(
+        "--headless",
+        dest="headless",
+        help="process the videos given by '-f' once with the selected algorithm without any UI and report the throughput",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--images",
+        dest="images",
+        help="a directory or a glob pattern (in quotes, e.g. 'photos/**/*.jpg') of still images that are processed once with the selected algorithm without any UI, the throughput is reported",
+        default=None,
+    )
+    parser.add_argument(
+        "--decode-threads",
+        dest="decode_threads",
+        help="the number of threads decoding the images given by '--images' ahead of the processing",
+        default=4,
+        type=int,
+    )
+    parser.add_argument(
+        "--encode-threads",
+        dest="encode_threads",
+        help="the number of threads encoding the results of the images given by '--images'",
+        default=4,
+        type=int,
+    )
+    parser.add_argument(
+        "-o",
+        "--filename-output",
+        dest="filename_output",
+        help="path to the video the results are written to in the headless mode, or to the directory the results of the images given by '--images' are written to (if not set, the results are discarded)",
+        default=None,
+    )
+    parser.add_argument(
+        "--output-fourcc",
+        dest="output_fourcc",
+        help="the FOURCC code of the codec used for the output video and the recordings",
+        default="mp4v",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        dest="processes",
+        help="the number of worker processes used in the headless mode and the batch mode of '--images' (stateful algorithms are processed sequentially, in the headless mode unless '--warmup-frames' is set)",
+        default=1,
+        type=int,
+    )
+    parser.add_argument(
+        "--warmup-frames",
+        dest="warmup_frames",
+        help="the number of frames a stateful algorithm processes before its results are used when it is split across worker processes",
+        default=0,
+        type=int,
     )
     parser.add_argument(
         "--hide-original-stream",
@@ -62,6 +306,64 @@ def get_args():
     return args
 
 
+def get_algorithm_settings(args):
+    """
+    This function collects the settings of the algorithms from the parsed arguments. Settings that are not given
+    are None, then the algorithms use their own default values.
+    """
+    return {
+        "dense_flow_scale": args.dense_flow_scale,
+        "dense_flow_levels": args.dense_flow_levels,
+        "backend": args.backend,
+    }
+
+
+def get_camera_settings(args):
+    """
+    This function collects the settings requested from the cameras from the parsed arguments. Settings that are not
+    given are None, then the defaults of the driver are used.
+    """
+    return {
+        "width": args.camera_width,
+        "height": args.camera_height,
+        "fps": args.camera_fps,
+        "fourcc": args.camera_fourcc,
+        "buffer_size": args.camera_buffer_size,
+    }
+
+
+def fourcc(value):
+    """
+    This function checks a FOURCC code given on the command line.
+    """
+    if len(value) != 4:
+        raise argparse.ArgumentTypeError(f"a FOURCC code has 4 characters: '{value}'")
+    return value
+
+
+def get_sources(args):
+    """
+    This function collects the sources that shall be processed from the parsed arguments. It returns a list of
+    (name, source, is_video) tuples, where source is either the path of a video or the id of a camera.
+    """
+    sources = [(os.path.basename(filename), filename, True) for filename in args.filename_video or []]
+    sources += [(f"camera {device_id}", device_id, False) for device_id in args.device_id or []]
+    if not sources:
+        sources.append(("camera 1", 1, False))
+    return sources
+
+
+def get_source_filename(filename, source_idx, sources):
+    """
+    This function returns the filename of a file written for the given source (e.g. a recording). With several
+    sources, the index of the source is appended to the name of the file.
+    """
+    if sources == 1:
+        return filename
+    root, extension = os.path.splitext(filename)
+    return f"{root}_{source_idx}{extension}"
+
+
 def print_parser_information_for_readme():
     """
     This function loads the argument parser used in this project and prints the available options in a more
@@ -89,8 +391,9 @@ def print_parser_information_for_readme():
         default_value = (
             action.default if action.default is not argparse.SUPPRESS else "None"
         )
-        # Print the next line for the table.
-        print(f"| {flag} | {name} | {action.help} | `{default_value}` |")
+        # Print the next line for the table, pipes in the help (e.g. in the pipeline descriptions) would end the cell.
+        description = action.help.replace("|", "\\|")
+        print(f"| {flag} | {name} | {description} | `{default_value}` |")
 
 
 if __name__ == "__main__":
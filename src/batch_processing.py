@@ -0,0 +1,222 @@
+import cv2
+import glob
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# The extensions of the images that are processed (other files in the directory are ignored).
+IMAGE_EXTENSIONS = (".bmp", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp")
+
+
+def find_images(pattern):
+    """
+    Returns the sorted paths of the images in the given directory or matching the given glob pattern (e.g.
+    "photos/**/*.jpg").
+    """
+    if os.path.isdir(pattern):
+        paths = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+    else:
+        paths = glob.glob(pattern, recursive=True)
+    return sorted(
+        path
+        for path in paths
+        if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def get_output_filenames(filenames, directory_output):
+    """
+    Returns the paths the results of the given images are written to. They keep their paths relative to the
+    directory that contains all images, so that images with the same name in different subdirectories (e.g. found by
+    a recursive glob pattern) do not overwrite each other. The subdirectories are created.
+    """
+    if not filenames:
+        return []
+    directory_input = os.path.commonpath(
+        [os.path.dirname(os.path.abspath(filename)) for filename in filenames]
+    )
+    filenames_output = [
+        os.path.join(directory_output, os.path.relpath(os.path.abspath(filename), directory_input))
+        for filename in filenames
+    ]
+    for directory in set(os.path.dirname(filename) for filename in filenames_output):
+        os.makedirs(directory, exist_ok=True)
+    return filenames_output
+
+
+def decode_image(filename):
+    """
+    Reads the image and returns it (None if it cannot be read) together with the time the decoding took.
+    """
+    time_start = time.perf_counter()
+    image = cv2.imread(filename, cv2.IMREAD_COLOR)
+    return image, time.perf_counter() - time_start
+
+
+def encode_image(filename, image):
+    """
+    Writes the image and returns whether it was written together with the time the encoding took.
+    """
+    time_start = time.perf_counter()
+    written = cv2.imwrite(filename, image)
+    return written, time.perf_counter() - time_start
+
+
+def process_image(function, settings, filename_input, filename_output):
+    """
+    Decodes, processes and encodes a single image and returns whether it succeeded and the times of the three
+    steps. The image is its own previous frame.
+    This function runs in the worker processes, so it has to be defined on module level.
+    """
+    image, decode_time = decode_image(filename_input)
+    if image is None:
+        return False, decode_time, 0, 0
+    time_start = time.perf_counter()
+    params = function({"frame_prev": image, "frame_curr": image, "settings": settings})
+    process_time = time.perf_counter() - time_start
+    if filename_output is None:
+        return True, decode_time, process_time, 0
+    written, encode_time = encode_image(filename_output, params["frame_result"])
+    return written, decode_time, process_time, encode_time
+
+
+def process_images(
+    image_processor,
+    filenames,
+    directory_output=None,
+    processes=1,
+    decode_threads=4,
+    encode_threads=4,
+):
+    """
+    Pushes the images once through the algorithm currently selected in the image processor without any UI. If an
+    output directory is given, the results are written into it with the names of the images (see
+    get_output_filenames).
+    Stateless algorithms can process every image on its own, so with more than one process the images are spread
+    across a pool of worker processes which decode, process and encode them. Otherwise the images are processed one
+    after another (in the order of the filenames, so a stateful algorithm sees them as consecutive frames), while
+    the next images are already decoded on a pool of decode threads and the results are encoded on a pool of
+    encode threads.
+    Returns a dictionary with the statistics of the run (images, failed, wall_time, images_per_second and the
+    summed decode_time, process_time and encode_time of all images).
+    """
+    if directory_output is not None:
+        filenames_output = get_output_filenames(filenames, directory_output)
+    else:
+        filenames_output = [None] * len(filenames)
+    stats = {
+        "images": 0,
+        "failed": 0,
+        "decode_time": 0.0,
+        "process_time": 0.0,
+        "encode_time": 0.0,
+    }
+
+    time_start = time.perf_counter()
+    if processes > 1 and not image_processor.is_selected_stateful():
+        _process_on_processes(image_processor, filenames, filenames_output, processes, stats)
+    else:
+        _process_on_threads(
+            image_processor, filenames, filenames_output, decode_threads, encode_threads, stats
+        )
+    stats["wall_time"] = time.perf_counter() - time_start
+    stats["images_per_second"] = (
+        stats["images"] / stats["wall_time"] if stats["wall_time"] > 0 else 0
+    )
+    return stats
+
+
+def _process_on_processes(image_processor, filenames, filenames_output, processes, stats):
+    tasks = [
+        (
+            image_processor.get_selected_function(),
+            image_processor.settings,
+            filename,
+            filename_output,
+        )
+        for filename, filename_output in zip(filenames, filenames_output)
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        # The images are independent of each other, so the results can be collected in any order. Every worker
+        # gets a few images at a time, so that they are not idle while waiting for the next task.
+        chunk_size = max(1, min(8, len(tasks) // (4 * processes)))
+        for ok, decode_time, process_time, encode_time in pool.starmap(
+            process_image, tasks, chunksize=chunk_size
+        ):
+            _count(stats, ok, decode_time, process_time, encode_time)
+
+
+def _process_on_threads(
+    image_processor, filenames, filenames_output, decode_threads, encode_threads, stats
+):
+    filenames = iter(zip(filenames, filenames_output))
+    # The images decoded ahead of the processing and the results waiting for their encoding. Both are limited, so
+    # that a large directory is not read into the memory completely.
+    decoding = deque()
+    encoding = deque()
+    max_decoding = 2 * decode_threads
+    max_encoding = 2 * encode_threads
+
+    def submit_decode():
+        filename, filename_output = next(filenames, (None, None))
+        if filename is not None:
+            decoding.append((filename_output, decode_executor.submit(decode_image, filename)))
+
+    def collect_encode():
+        written, encode_time = encoding.popleft().result()
+        stats["encode_time"] += encode_time
+        if not written:
+            stats["images"] -= 1
+            stats["failed"] += 1
+
+    params = dict()
+    with ThreadPoolExecutor(decode_threads) as decode_executor, ThreadPoolExecutor(
+        encode_threads
+    ) as encode_executor:
+        for _ in range(max_decoding):
+            submit_decode()
+        frame_prev = None
+        while decoding:
+            filename_output, future = decoding.popleft()
+            submit_decode()
+            image, decode_time = future.result()
+            if image is None:
+                _count(stats, False, decode_time, 0, 0)
+                continue
+
+            # The first image has no predecessor, so it is its own previous frame. An image of a different size
+            # cannot be compared with its predecessor, so it starts a new sequence and the state of a stateful
+            # algorithm (e.g. the tracked points of the optical flow) is discarded.
+            if frame_prev is not None and frame_prev.shape != image.shape:
+                params = dict()
+                frame_prev = None
+            time_start = time.perf_counter()
+            params["frame_prev"] = frame_prev if frame_prev is not None else image
+            params["frame_curr"] = image
+            params = image_processor.process(params)
+            _count(stats, True, decode_time, time.perf_counter() - time_start, 0)
+            frame_prev = image
+
+            if filename_output is not None:
+                # The result may be a buffer of the buffer pool, which is overwritten by the next image.
+                encoding.append(
+                    encode_executor.submit(
+                        encode_image,
+                        filename_output,
+                        params["frame_result"].copy(),
+                    )
+                )
+                while len(encoding) > max_encoding:
+                    collect_encode()
+        while encoding:
+            collect_encode()
+
+
+def _count(stats, ok, decode_time, process_time, encode_time):
+    stats["images" if ok else "failed"] += 1
+    stats["decode_time"] += decode_time
+    stats["process_time"] += process_time
+    stats["encode_time"] += encode_time
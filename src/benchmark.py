@@ -0,0 +1,571 @@
+import argparse
+import cv2
+import json
+import math
+import numpy as np
+import platform
+import sys
+import time
+import tracemalloc
+
+from algorithms import ALGORITHMS, numpy_backend
+from algorithms.properties import get_halo
+from image_processor import ImageProcessor
+from tiled_executor import TiledExecutor
+
+
+# =========================================================================================
+#       CONSTANTS
+# =========================================================================================
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+# The seed of the synthetic frames, so that every run benchmarks the same frames.
+SYNTHETIC_SEED = 42
+
+
+# =========================================================================================
+#       FRAME SOURCES
+# =========================================================================================
+
+
+def get_synthetic_frames(resolution, count):
+    """
+    Returns deterministic synthetic frames of the given resolution. The frames contain some structure (blurred
+    noise and shapes) that moves from frame to frame, so that e.g. the optical flow has something to track.
+    """
+    width, height = resolution
+    rng = np.random.default_rng(SYNTHETIC_SEED)
+    base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    base = cv2.GaussianBlur(base, (0, 0), sigmaX=max(1, width / 200))
+    for _ in range(20):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        size = int(rng.integers(width // 40, width // 10))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.rectangle(base, (int(x), int(y)), (int(x) + size, int(y) + size), color, -1)
+    shift = max(1, width // 320)
+    return [np.roll(base, idx * shift, axis=1) for idx in range(count)]
+
+
+def get_motion_frames(resolution, count, motion):
+    """
+    Returns frames of a static synthetic scene in which only a square covering the given fraction of the frame
+    moves.
+    """
+    width, height = resolution
+    base = get_synthetic_frames(resolution, 1)[0]
+    side = min(width, height, max(1, round(math.sqrt(motion * width * height))))
+    shift = max(1, width // 160)
+    frames = []
+    for idx in range(count):
+        frame = base.copy()
+        x = (idx * shift) % max(1, width - side)
+        y = (height - side) // 2
+        # The square shows a flipped part of the scene, so that it has some structure.
+        frame[y : y + side, x : x + side] = base[y + side - 1 : y - 1 if y > 0 else None : -1, x : x + side]
+        frames.append(frame)
+    return frames
+
+
+def get_recorded_frames(filename_video, resolution, count):
+    """
+    Returns the first frames of the given video scaled to the given resolution. If the video is shorter, it is
+    repeated.
+    """
+    video_capture = cv2.VideoCapture(filename_video)
+    if not video_capture.isOpened():
+        raise IOError(f"cannot open video {filename_video}")
+    frames = []
+    while len(frames) < count:
+        ret, frame = video_capture.read()
+        if not ret:
+            if not frames:
+                raise IOError(f"cannot read a frame from video {filename_video}")
+            video_capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            continue
+        frames.append(cv2.resize(frame, resolution))
+    video_capture.release()
+    return frames
+
+
+# =========================================================================================
+#       BENCHMARK
+# =========================================================================================
+
+
+def run_frames(image_processor, frames, params, frame_prev):
+    """
+    Processes the frames with the selected algorithm and returns the latency of every frame in seconds.
+    """
+    latencies = []
+    for frame_curr in frames:
+        params["frame_prev"] = frame_prev
+        params["frame_curr"] = frame_curr
+        time_start = time.perf_counter()
+        params = image_processor.process(params)
+        latencies.append(time.perf_counter() - time_start)
+        frame_prev = frame_curr
+    return latencies, params, frame_prev
+
+
+def benchmark_algorithm(algorithm_idx, frames, warmup_frames, memory_frames):
+    """
+    Benchmarks a single algorithm on the given frames and returns its statistics.
+    The first warmup_frames frames are processed before the timing starts, so that stateful algorithms (like the
+    optical flow) are in their steady state. Afterwards some frames are processed while tracing the memory
+    allocations, this is done separately since tracing slows down the processing.
+    """
+    image_processor = ImageProcessor(ALGORITHMS, algorithm_idx)
+    params = dict()
+    warmup, timed = frames[:warmup_frames], frames[warmup_frames:]
+    frame_prev = frames[0]
+    _, params, frame_prev = run_frames(image_processor, warmup, params, frame_prev)
+    latencies, params, frame_prev = run_frames(image_processor, timed, params, frame_prev)
+
+    # Trace the memory: the peak over all frames and the bytes allocated per frame (the peak within the frame
+    # compared to the memory before the frame), which should be close to zero in the steady state since the
+    # results are written into the buffers of the buffer pool.
+    buffer_pool_allocations = image_processor.buffer_pool.allocations
+    tracemalloc.start()
+    memory_start, _ = tracemalloc.get_traced_memory()
+    memory_peak = memory_start
+    allocated_per_frame = []
+    for frame_curr in timed[:memory_frames]:
+        memory_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        _, params, frame_prev = run_frames(image_processor, [frame_curr], params, frame_prev)
+        _, memory_frame_peak = tracemalloc.get_traced_memory()
+        allocated_per_frame.append(memory_frame_peak - memory_before)
+        memory_peak = max(memory_peak, memory_frame_peak)
+    tracemalloc.stop()
+    buffer_pool_allocations = image_processor.buffer_pool.allocations - buffer_pool_allocations
+
+    latencies_ms = np.array(latencies) * 1000
+    mean_ms = float(latencies_ms.mean())
+    return {
+        "algorithm": image_processor.algorithm_names[algorithm_idx],
+        "mean_ms": mean_ms,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "fps": 1000 / mean_ms if mean_ms > 0 else 0,
+        "peak_memory_bytes": int(memory_peak - memory_start),
+        "allocated_bytes_per_frame": int(np.mean(allocated_per_frame)) if allocated_per_frame else 0,
+        "buffer_pool_allocations_per_frame": buffer_pool_allocations / max(1, memory_frames),
+    }
+
+
+# The neighborhood filters benchmarked with the tiled executor and the radius of their kernels.
+TILED_FILTERS = {
+    "gaussian blur (5x5)": (
+        lambda src, dst: cv2.GaussianBlur(src, (5, 5), 0, dst=dst),
+        2,
+    ),
+    "adaptive mean threshold (21)": (
+        lambda src, dst: cv2.adaptiveThreshold(
+            src, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 21, 8, dst=dst
+        ),
+        10,
+    ),
+    "adaptive gauss threshold (21)": (
+        lambda src, dst: cv2.adaptiveThreshold(
+            src, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 21, 8, dst=dst
+        ),
+        10,
+    ),
+    "sobel xy (5)": (
+        lambda src, dst: cv2.Sobel(src, cv2.CV_8U, 1, 1, ksize=5, dst=dst),
+        2,
+    ),
+}
+
+
+def benchmark_tiling(resolution_name, threads_list, repetitions):
+    """
+    Benchmarks the neighborhood filters with the tiled executor for the given numbers of threads and compares
+    them with the untiled filters. OpenCV's own threading is disabled meanwhile, so that the speed-up is only
+    caused by the tiling. The results of the tiled filters have to be identical to the untiled ones.
+    """
+    img = cv2.cvtColor(
+        get_synthetic_frames(RESOLUTIONS[resolution_name], 1)[0], cv2.COLOR_BGR2GRAY
+    )
+    opencv_threads = cv2.getNumThreads()
+    cv2.setNumThreads(1)
+    results = []
+    try:
+        for filter_name, (function, halo) in TILED_FILTERS.items():
+            expected = function(img, None)
+            time_untiled = measure_time(lambda: function(img, None), repetitions)
+            for threads in threads_list:
+                tiled_executor = TiledExecutor(threads)
+                dst = np.empty_like(expected)
+                time_tiled = measure_time(
+                    lambda: tiled_executor.apply(function, img, halo, dst), repetitions
+                )
+                tiled_executor.close()
+                result = {
+                    "filter": filter_name,
+                    "resolution": resolution_name,
+                    "threads": threads,
+                    "untiled_ms": time_untiled * 1000,
+                    "tiled_ms": time_tiled * 1000,
+                    "speedup": time_untiled / time_tiled,
+                    "identical": bool(np.array_equal(expected, dst)),
+                }
+                results.append(result)
+                print(
+                    f"{resolution_name:>6} {filter_name:<30} {threads:3d} threads  "
+                    f"untiled {result['untiled_ms']:8.2f} ms  tiled {result['tiled_ms']:8.2f} ms  "
+                    f"speed-up {result['speedup']:5.2f}  identical: {result['identical']}"
+                )
+    finally:
+        cv2.setNumThreads(opencv_threads)
+    return results
+
+
+# The functions of the NumPy backend compared with their OpenCV counterparts, the first ones get the BGR frame, the
+# others its grayscale image.
+BACKEND_FUNCTIONS = {
+    "grayscale": (
+        lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY),
+        numpy_backend.grayscale,
+    ),
+    "gaussian blur (5x5)": (
+        lambda img: cv2.GaussianBlur(img, (5, 5), 0),
+        lambda img: numpy_backend.gaussian_blur(img, 5),
+    ),
+    "global threshold": (
+        lambda img: cv2.threshold(img, 127, 255, cv2.THRESH_BINARY)[1],
+        lambda img: numpy_backend.threshold(img, 127, 255),
+    ),
+    "adaptive mean threshold (21)": (
+        lambda img: cv2.adaptiveThreshold(
+            img, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 21, 8
+        ),
+        lambda img: numpy_backend.adaptive_mean_threshold(img, 255, 21, 8),
+    ),
+    "adaptive gauss threshold (21)": (
+        lambda img: cv2.adaptiveThreshold(
+            img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 21, 8
+        ),
+        lambda img: numpy_backend.adaptive_gauss_threshold(img, 255, 21, 8),
+    ),
+    "sobel xy (5)": (
+        lambda img: cv2.Sobel(img, cv2.CV_8U, 1, 1, ksize=5),
+        lambda img: numpy_backend.sobel(img, 1, 1, 5),
+    ),
+    "harris (2, 3, 0.04)": (
+        lambda img: cv2.cornerHarris(img, 2, 3, 0.04),
+        lambda img: numpy_backend.harris(img, 2, 3, 0.04),
+    ),
+}
+
+
+def benchmark_backends(resolution_name, repetitions):
+    """
+    Compares the functions of the NumPy backend with their OpenCV counterparts: how well the results agree (the
+    largest difference relative to the range of the OpenCV result and the fraction of the pixels that differ) and
+    how much slower the NumPy functions are.
+    """
+    frame = get_synthetic_frames(RESOLUTIONS[resolution_name], 1)[0]
+    img_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    results = []
+    for function_name, (function_opencv, function_numpy) in BACKEND_FUNCTIONS.items():
+        img = frame if function_name == "grayscale" else img_gray
+        expected = function_opencv(img).astype(np.float64)
+        diff = np.abs(function_numpy(img).astype(np.float64) - expected)
+        value_range = max(float(np.abs(expected).max()), np.finfo(np.float32).tiny)
+        result = {
+            "function": function_name,
+            "resolution": resolution_name,
+            "opencv_ms": measure_time(lambda: function_opencv(img), repetitions) * 1000,
+            "numpy_ms": measure_time(lambda: function_numpy(img), repetitions) * 1000,
+            "max_relative_diff": float(diff.max()) / value_range,
+            "differing_fraction": float(np.mean(diff > 0)),
+        }
+        result["ratio"] = result["numpy_ms"] / result["opencv_ms"]
+        results.append(result)
+        print(
+            f"{resolution_name:>6} {function_name:<30} opencv {result['opencv_ms']:8.2f} ms  "
+            f"numpy {result['numpy_ms']:8.2f} ms  ratio {result['ratio']:6.1f}  "
+            f"max diff {result['max_relative_diff'] * 100:6.3f} %  "
+            f"differing {result['differing_fraction'] * 100:6.3f} %"
+        )
+    return results
+
+
+def benchmark_incremental(resolution_name, motions, algorithm_indices, count):
+    """
+    Benchmarks the algorithms that support the incremental processing (see IncrementalProcessor) on scenes in which
+    the given fractions of the frame move, and compares them with the processing of the full frames. The results
+    of the incremental processing have to be identical to the full ones.
+    """
+    results = []
+    for motion in motions:
+        frames = get_motion_frames(RESOLUTIONS[resolution_name], count + 1, motion)
+        for algorithm_idx in algorithm_indices:
+            if get_halo(ALGORITHMS[algorithm_idx]) is None:
+                continue
+            image_processor_full = ImageProcessor(ALGORITHMS, algorithm_idx)
+            image_processor_incremental = ImageProcessor(
+                ALGORITHMS, algorithm_idx, incremental_tolerance=0
+            )
+            # The first frame is processed completely by both of them.
+            _, params_full, _ = run_frames(image_processor_full, frames[:1], dict(), frames[0])
+            _, params_incremental, _ = run_frames(
+                image_processor_incremental, frames[:1], dict(), frames[0]
+            )
+            latencies_full, params_full, _ = run_frames(
+                image_processor_full, frames[1:], params_full, frames[0]
+            )
+            latencies_incremental, params_incremental, _ = run_frames(
+                image_processor_incremental, frames[1:], params_incremental, frames[0]
+            )
+            result = {
+                "algorithm": image_processor_full.algorithm_names[algorithm_idx],
+                "resolution": resolution_name,
+                "motion": motion,
+                "full_ms": float(np.mean(latencies_full)) * 1000,
+                "incremental_ms": float(np.mean(latencies_incremental)) * 1000,
+                "identical": bool(
+                    np.array_equal(
+                        params_full["frame_result"], params_incremental["frame_result"]
+                    )
+                ),
+            }
+            result["speedup"] = result["full_ms"] / result["incremental_ms"]
+            results.append(result)
+            print(
+                f"{resolution_name:>6} {result['algorithm']:<40} motion {motion * 100:5.1f} %  "
+                f"full {result['full_ms']:8.2f} ms  incremental {result['incremental_ms']:8.2f} ms  "
+                f"speed-up {result['speedup']:5.2f}  identical: {result['identical']}"
+            )
+    return results
+
+
+def measure_time(function, repetitions):
+    """
+    Returns the median time in seconds of the given number of calls of the function.
+    """
+    function()
+    times = []
+    for _ in range(repetitions):
+        time_start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - time_start)
+    return float(np.median(times))
+
+
+def run_benchmark(args):
+    """
+    Runs all selected algorithms on all selected sources and resolutions and returns the report.
+    """
+    algorithm_indices = (
+        args.algorithms if args.algorithms is not None else range(len(ALGORITHMS))
+    )
+    sources = ["synthetic"] + ([args.filename_video] if args.filename_video else [])
+    count = args.warmup_frames + args.frames
+    results = []
+    for source in sources:
+        for resolution_name in args.resolutions:
+            resolution = RESOLUTIONS[resolution_name]
+            if source == "synthetic":
+                frames = get_synthetic_frames(resolution, count)
+            else:
+                frames = get_recorded_frames(source, resolution, count)
+            for algorithm_idx in algorithm_indices:
+                result = benchmark_algorithm(
+                    algorithm_idx, frames, args.warmup_frames, args.memory_frames
+                )
+                result["source"] = source
+                result["resolution"] = resolution_name
+                results.append(result)
+                print(
+                    f"{source:>10} {resolution_name:>6} {result['algorithm']:<40} "
+                    f"mean {result['mean_ms']:8.2f} ms  p50 {result['p50_ms']:8.2f} ms  "
+                    f"p99 {result['p99_ms']:8.2f} ms  {result['fps']:8.1f} fps  "
+                    f"{result['peak_memory_bytes'] / 2**20:8.1f} MiB  "
+                    f"{result['allocated_bytes_per_frame'] / 2**10:8.1f} KiB/frame"
+                )
+    tiling_results = []
+    if args.tiling_threads is not None:
+        for resolution_name in args.resolutions:
+            tiling_results += benchmark_tiling(
+                resolution_name, args.tiling_threads, args.frames
+            )
+    incremental_results = []
+    if args.incremental_motions is not None:
+        for resolution_name in args.resolutions:
+            incremental_results += benchmark_incremental(
+                resolution_name, args.incremental_motions, algorithm_indices, args.frames
+            )
+    backend_results = []
+    if args.backends:
+        for resolution_name in args.resolutions:
+            backend_results += benchmark_backends(resolution_name, args.frames)
+    return {
+        "meta": {
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "frames": args.frames,
+            "warmup_frames": args.warmup_frames,
+        },
+        "results": results,
+        "tiling": tiling_results,
+        "incremental": incremental_results,
+        "backends": backend_results,
+    }
+
+
+def find_regressions(report, baseline, threshold):
+    """
+    Compares the mean latencies of the report with the ones of the baseline report. Returns a list of messages
+    for all results that got slower by more than the threshold (relative, e.g. 0.1 for 10 %).
+    """
+
+    def key(result):
+        return (result["source"], result["resolution"], result["algorithm"])
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        baseline_result = baseline_results.get(key(result))
+        if baseline_result is None:
+            continue
+        ratio = result["mean_ms"] / baseline_result["mean_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{' '.join(key(result))}: {baseline_result['mean_ms']:.2f} ms -> "
+                f"{result['mean_ms']:.2f} ms ({(ratio - 1) * 100:+.1f} %)"
+            )
+    return regressions
+
+
+# =========================================================================================
+#       MAIN
+# =========================================================================================
+
+
+def get_argument_parser():
+    """
+    This function returns the argument parser of the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="benchmark of all algorithms of the image processor"
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithms",
+        dest="algorithms",
+        help="the indices of the algorithms that shall be benchmarked (if not set, all algorithms are benchmarked)",
+        nargs="+",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "-r",
+        "--resolutions",
+        dest="resolutions",
+        help="the resolutions the algorithms are benchmarked at",
+        nargs="+",
+        choices=list(RESOLUTIONS),
+        default=list(RESOLUTIONS),
+    )
+    parser.add_argument(
+        "-f",
+        "--filename-video",
+        dest="filename_video",
+        help="path to a recorded video that is benchmarked in addition to the synthetic frames",
+        default=None,
+    )
+    parser.add_argument(
+        "-n",
+        "--frames",
+        dest="frames",
+        help="the number of timed frames per algorithm and resolution",
+        default=50,
+        type=int,
+    )
+    parser.add_argument(
+        "--warmup-frames",
+        dest="warmup_frames",
+        help="the number of frames processed before the timing starts (needed by stateful algorithms)",
+        default=5,
+        type=int,
+    )
+    parser.add_argument(
+        "--memory-frames",
+        dest="memory_frames",
+        help="the number of frames processed while tracing the memory allocations",
+        default=3,
+        type=int,
+    )
+    parser.add_argument(
+        "--tiling-threads",
+        dest="tiling_threads",
+        help="if set, the neighborhood filters are additionally benchmarked with the tiled executor for the given numbers of threads",
+        nargs="+",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--incremental-motions",
+        dest="incremental_motions",
+        help="if set, the algorithms that support the incremental processing are additionally benchmarked on scenes in which the given fractions of the frame move (e.g. 0.01 0.1 0.5)",
+        nargs="+",
+        default=None,
+        type=float,
+    )
+    parser.add_argument(
+        "--backends",
+        dest="backends",
+        help="if set, the functions of the NumPy backend are additionally compared with their OpenCV counterparts (agreement of the results and speed ratio)",
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        dest="output",
+        help="path to the JSON file the report is written to",
+        default=None,
+    )
+    parser.add_argument(
+        "--baseline",
+        dest="baseline",
+        help="path to the JSON report of a previous run, the program fails if an algorithm got slower than the threshold",
+        default=None,
+    )
+    parser.add_argument(
+        "--threshold",
+        dest="threshold",
+        help="the relative increase of the mean latency that counts as a regression",
+        default=0.1,
+        type=float,
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_argument_parser().parse_args()
+    report = run_benchmark(args)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = find_regressions(report, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(regression)
+            sys.exit(1)
@@ -0,0 +1,63 @@
+import numpy as np
+import threading
+
+
+class BufferPool:
+    """
+    Hands out preallocated arrays, so that the algorithms can write their results into them (using the dst
+    arguments of OpenCV) instead of allocating new arrays for every frame.
+    There are two kinds of buffers:
+    - named buffers (get): one buffer per name that is reused for every frame, e.g. the result of an algorithm.
+    - free buffers (acquire / release): buffers keyed by shape and dtype that are handed back to the pool when
+      they are not needed anymore, e.g. the products of the frame cache that live for a few frames.
+    Buffers are only reallocated if the resolution (shape) or dtype changes.
+    """
+
+    def __init__(self):
+        self.named_buffers = dict()
+        self.free_buffers = dict()
+        self.lock = threading.Lock()
+        # The number of arrays allocated by the pool, in the steady state this does not change anymore.
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        """
+        Returns the buffer with the given name. It is only reallocated if its shape or dtype changed.
+        """
+        with self.lock:
+            buffer = self.named_buffers.get(name)
+            if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+                buffer = self.named_buffers[name] = np.empty(shape, dtype)
+                self.allocations += 1
+            return buffer
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        Returns a buffer of the given shape and dtype that is not used by anyone else until it is released.
+        """
+        key = (shape, np.dtype(dtype))
+        with self.lock:
+            free_buffers = self.free_buffers.get(key)
+            if free_buffers:
+                return free_buffers.pop()
+            if free_buffers is None:
+                self.free_buffers[key] = []
+            self.allocations += 1
+        return np.empty(shape, dtype)
+
+    def clear_free_buffers(self):
+        """
+        Drops all free buffers, e.g. because the resolution changed and they will not be needed anymore.
+        """
+        with self.lock:
+            self.free_buffers = dict()
+
+    def release(self, buffer):
+        """
+        Hands a buffer obtained by acquire() back to the pool.
+        """
+        key = (buffer.shape, buffer.dtype)
+        with self.lock:
+            free_buffers = self.free_buffers.get(key)
+            if free_buffers is not None:
+                free_buffers.append(buffer)
@@ -0,0 +1,120 @@
+import cv2
+import numpy as np
+import time
+
+
+# The settings that can be requested from a camera and their properties, in the order they are applied: the format
+# decides which resolutions are available and the resolution decides which frame rates are available.
+CAMERA_PROPERTIES = [
+    ("fourcc", cv2.CAP_PROP_FOURCC),
+    ("width", cv2.CAP_PROP_FRAME_WIDTH),
+    ("height", cv2.CAP_PROP_FRAME_HEIGHT),
+    ("fps", cv2.CAP_PROP_FPS),
+    ("buffer_size", cv2.CAP_PROP_BUFFERSIZE),
+]
+
+
+def apply_camera_settings(video_capture, settings):
+    """
+    Requests the given settings (see get_camera_settings in argument_parser.py) from the opened video capture,
+    settings that are None are left at the defaults of the driver. Returns the names of the settings the backend
+    rejected. The driver may also pick the closest supported value instead of the requested one, so the values it
+    actually uses have to be read back (see get_camera_properties).
+    """
+    rejected = []
+    for name, prop in CAMERA_PROPERTIES:
+        value = settings.get(name)
+        if value is None:
+            continue
+        if name == "fourcc":
+            value = cv2.VideoWriter_fourcc(*value)
+        try:
+            if not video_capture.set(prop, value):
+                rejected.append(name)
+        except cv2.error:
+            rejected.append(name)
+    return rejected
+
+
+def get_camera_properties(video_capture):
+    """
+    Returns the settings the video capture actually uses (the ones negotiated with the driver for a camera) and the
+    name of its backend. Values the backend does not report are None.
+    """
+    properties = dict()
+    for name, prop in CAMERA_PROPERTIES:
+        value = video_capture.get(prop)
+        properties[name] = value if value > 0 else None
+    fourcc = properties["fourcc"]
+    if fourcc is not None:
+        fourcc = int(fourcc)
+        properties["fourcc"] = "".join(chr((fourcc >> 8 * idx) & 0xFF) for idx in range(4))
+    for name in ("width", "height", "buffer_size"):
+        if properties[name] is not None:
+            properties[name] = int(properties[name])
+    try:
+        properties["backend"] = video_capture.getBackendName()
+    except cv2.error:
+        properties["backend"] = None
+    return properties
+
+
+def format_camera_properties(properties, rejected=()):
+    """
+    Returns the properties (see get_camera_properties) as one line, the settings the backend rejected are listed at
+    the end.
+    """
+    width, height = properties["width"], properties["height"]
+    parts = [
+        f"{width}x{height}" if width is not None and height is not None else "size: ?",
+        f"{properties['fps']:.1f} fps" if properties["fps"] is not None else "fps: ?",
+        f"fourcc: {properties['fourcc'] or '?'}",
+        f"buffer: {properties['buffer_size'] if properties['buffer_size'] is not None else '?'}",
+    ]
+    if properties["backend"] is not None:
+        parts.append(f"backend: {properties['backend']}")
+    line = ", ".join(parts)
+    if rejected:
+        line += f" (rejected: {', '.join(rejected)})"
+    return line
+
+
+def measure_grab_intervals(video_capture, count):
+    """
+    Grabs up to count frames from the video capture as fast as they are delivered (without decoding them) and
+    returns the statistics of the intervals between the grab() calls.
+    For a camera the intervals show the frame period the driver really delivers: the frames buffered by the driver
+    are returned at once (a burst of short intervals at the start), afterwards every grab() waits for the next
+    frame. For a video file they only show the time needed to read a frame, so it can stand in for a camera to test
+    this mode. If the source ends or fails, the frames grabbed until then are reported.
+    """
+    time_start = time.perf_counter()
+    timestamps = []
+    for _ in range(count):
+        if not video_capture.grab():
+            break
+        timestamps.append(time.perf_counter())
+
+    stats = {
+        "frames": len(timestamps),
+        "first_frame_ms": (timestamps[0] - time_start) * 1000 if timestamps else None,
+    }
+    if len(timestamps) < 2:
+        return stats
+    intervals_ms = np.diff(timestamps) * 1000
+    median_ms = float(np.median(intervals_ms))
+    # The leading intervals much shorter than the frame period are frames that were already buffered.
+    burst_frames = 0
+    while burst_frames < len(intervals_ms) and intervals_ms[burst_frames] < median_ms / 4:
+        burst_frames += 1
+    stats.update(
+        {
+            "mean_ms": float(intervals_ms.mean()),
+            "p50_ms": median_ms,
+            "p99_ms": float(np.percentile(intervals_ms, 99)),
+            "max_ms": float(intervals_ms.max()),
+            "fps": (len(timestamps) - 1) / (timestamps[-1] - timestamps[0]),
+            "burst_frames": burst_frames,
+        }
+    )
+    return stats
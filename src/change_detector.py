@@ -0,0 +1,49 @@
+import cv2
+
+
+# The size of the thumbnails the frames are compared at. Averaging the pixels into a thumbnail removes most of the
+# sensor noise, while a moving object still changes some of its pixels noticeably.
+THUMBNAIL_SIZE = (64, 48)
+
+
+class ChangeDetector:
+    """
+    Tells whether a frame differs from the last processed frame. The frames are compared by the maximum absolute
+    difference of the gray levels of their thumbnails. The comparison is made against the last frame that was
+    actually processed and not against the previous frame, so that a slow change (e.g. the light of the day) still
+    triggers the processing at some point.
+    """
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        # The thumbnail and shape of the last processed frame and the last compared frame with its thumbnail.
+        self.thumbnail_reference = None
+        self.shape_reference = None
+        self.frame = None
+        self.thumbnail = None
+
+    def is_changed(self, frame):
+        """
+        Returns True if the frame differs from the last processed frame by more than the tolerance.
+        """
+        thumbnail = self.__get_thumbnail(frame)
+        if self.thumbnail_reference is None or frame.shape != self.shape_reference:
+            return True
+        return cv2.absdiff(thumbnail, self.thumbnail_reference).max() > self.tolerance
+
+    def accept(self, frame):
+        """
+        Marks the frame as processed, the following frames are compared against it.
+        """
+        self.thumbnail_reference = self.__get_thumbnail(frame)
+        self.shape_reference = frame.shape
+
+    def __get_thumbnail(self, frame):
+        # The thumbnail of a frame that was just compared is not computed again.
+        if frame is not self.frame:
+            thumbnail = cv2.resize(frame, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+            if thumbnail.ndim == 3:
+                thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+            self.frame = frame
+            self.thumbnail = thumbnail
+        return self.thumbnail
@@ -0,0 +1,173 @@
+import cv2
+import numpy as np
+import threading
+from collections import deque
+
+
+class FrameCacheEntry:
+    """
+    The products of a single frame.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.products = dict()
+        # The locks guarding the computation of the products.
+        self.locks = dict()
+        # The buffers acquired from the buffer pool, they are released when the entry is evicted.
+        self.buffers = []
+
+
+class FrameCache:
+    """
+    Memoizes products derived from the frames (grayscale image, blurred, scaled images, pyramids), so that several
+    algorithms (or several steps of one algorithm) do not need to compute them again.
+    The products of the previous frames are carried forward: the current frame of the last call is the previous
+    frame of this call, so e.g. the optical flow does not need to convert the previous frame to grayscale again.
+    The products of frames older than max_age are evicted. If a buffer pool is given, the products are written
+    into buffers of the pool, which are handed back when they are evicted. So a product must not be kept longer
+    than its frame is in the cache.
+    Several threads may request products of the same frame at the same time, every product is still only computed
+    once. The frames must only be updated while no other thread is using the cache.
+    """
+
+    def __init__(self, max_age=1, buffer_pool=None, tiled_executor=None):
+        self.max_age = max_age
+        self.buffer_pool = buffer_pool
+        # If given, the blurred images are computed in parallel strips.
+        self.tiled_executor = tiled_executor
+        # The entry at index 0 is the current frame, the entry at index 1 the previous frame and so on.
+        self.entries = deque()
+        self.lock = threading.Lock()
+
+    def update(self, frame_prev, frame_curr):
+        """
+        Sets the frames of the next call. Has to be called for every new frame before the products are requested.
+        """
+        if self.entries and self.entries[0].frame is frame_curr:
+            # Nothing changed.
+            return
+        if self.entries and self.entries[0].frame is frame_prev:
+            # The normal case: the current frame became the previous frame.
+            self.entries.appendleft(FrameCacheEntry(frame_curr))
+            while len(self.entries) > self.max_age + 1:
+                self.__release(self.entries.pop())
+            return
+        # The frames are not related to the cached ones, so start from scratch.
+        resolution_changed = bool(self.entries) and (
+            self.entries[0].frame.shape != frame_curr.shape
+        )
+        self.clear()
+        if resolution_changed and self.buffer_pool is not None:
+            self.buffer_pool.clear_free_buffers()
+        # Some callers use the first frame as its own previous frame, then there is only one entry for both.
+        if frame_prev is not frame_curr:
+            self.entries.append(FrameCacheEntry(frame_prev))
+        self.entries.appendleft(FrameCacheEntry(frame_curr))
+
+    def clear(self):
+        while self.entries:
+            self.__release(self.entries.pop())
+
+    def get(self, key, compute, age=0):
+        """
+        Returns the product with the given key of the frame with the given age (0 is the current frame, 1 the
+        previous frame, ...). If it was not computed yet, compute(entry) is called and its result is cached.
+        """
+        # If there is no older entry, the oldest frame is its own predecessor.
+        entry = self.entries[min(age, len(self.entries) - 1)]
+        if key in entry.products:
+            return entry.products[key]
+        with self.lock:
+            key_lock = entry.locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in entry.products:
+                entry.products[key] = compute(entry)
+        return entry.products[key]
+
+    def get_gray(self, age=0):
+        return self.get(
+            "gray",
+            lambda entry: cv2.cvtColor(
+                entry.frame,
+                cv2.COLOR_BGR2GRAY,
+                dst=self.__acquire(entry, entry.frame.shape[:2]),
+            ),
+            age,
+        )
+
+    def get_blurred(self, ksize, age=0):
+        """
+        Returns the grayscale image blurred by a gaussian kernel of the given size.
+        """
+
+        def blur(src, dst):
+            return cv2.GaussianBlur(src, (ksize, ksize), 0, dst=dst)
+
+        def compute(entry):
+            dst = self.__acquire(entry, entry.frame.shape[:2])
+            if self.tiled_executor is not None:
+                return self.tiled_executor.apply(blur, self.get_gray(age), ksize // 2, dst)
+            return blur(self.get_gray(age), dst)
+
+        return self.get(("blurred", ksize), compute, age)
+
+    def get_scaled(self, scale, age=0):
+        """
+        Returns the grayscale image scaled by the given factor.
+        """
+        if scale == 1:
+            return self.get_gray(age)
+
+        def compute(entry):
+            height, width = entry.frame.shape[:2]
+            shape = (max(1, round(height * scale)), max(1, round(width * scale)))
+            return cv2.resize(
+                self.get_gray(age),
+                (shape[1], shape[0]),
+                dst=self.__acquire(entry, shape),
+                interpolation=cv2.INTER_AREA,
+            )
+
+        return self.get(("scaled", scale), compute, age)
+
+    def get_pyramid(self, levels, age=0):
+        """
+        Returns the gaussian pyramid of the grayscale image as a list, starting with the grayscale image itself
+        followed by levels downscaled images.
+        """
+        return self.get(
+            ("pyramid", levels),
+            lambda entry: self.__build_pyramid(entry, self.get_gray(age), levels),
+            age,
+        )
+
+    def __build_pyramid(self, entry, img, levels):
+        pyramid = [img]
+        for _ in range(levels):
+            height, width = pyramid[-1].shape[:2]
+            pyramid.append(
+                cv2.pyrDown(
+                    pyramid[-1],
+                    dst=self.__acquire(entry, ((height + 1) // 2, (width + 1) // 2)),
+                )
+            )
+        return pyramid
+
+    def __acquire(self, entry, shape, dtype=np.uint8):
+        """
+        Returns a buffer for a product of the given entry or None (OpenCV will allocate the result then).
+        """
+        if self.buffer_pool is None:
+            return None
+        buffer = self.buffer_pool.acquire(shape, dtype)
+        with self.lock:
+            entry.buffers.append(buffer)
+        return buffer
+
+    def __release(self, entry):
+        if self.buffer_pool is None:
+            return
+        for buffer in entry.buffers:
+            self.buffer_pool.release(buffer)
+        entry.buffers = []
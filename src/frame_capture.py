@@ -0,0 +1,226 @@
+import cv2
+import threading
+import time
+from collections import deque
+from enum import Enum
+
+from camera_settings import apply_camera_settings, get_camera_properties
+
+
+class CapturePolicy(Enum):
+    LATEST = 1
+    LOSSLESS = 2
+
+    def __str__(self):
+        if self == CapturePolicy.LATEST:
+            return "latest"
+        else:
+            return "lossless"
+
+
+class FrameCapture:
+    """
+    Reads the frames of a cv2.VideoCapture on a dedicated reader thread and stores them in a bounded ring buffer,
+    so that the processing loop never has to wait for the device I/O.
+    The policy decides what happens if the processing is slower than the source:
+    - LATEST (live cameras): the oldest frames are dropped, read() always returns the freshest frame.
+    - LOSSLESS (video files): the reader thread waits until there is space in the buffer again, no frame is lost.
+    """
+
+    def __init__(
+        self,
+        source,
+        policy=CapturePolicy.LATEST,
+        buffer_size=4,
+        loop=False,
+        loop_cache=None,
+        camera_settings=None,
+    ):
+        self.source = source
+        self.policy = policy
+        self.buffer_size = max(1, buffer_size)
+        # If the source is a video file, it can be restarted when it ended. If a loop cache is given, the decoded
+        # frames of the first pass are kept and replayed instead of decoding the video again.
+        self.loop = loop
+        self.loop_cache = loop_cache if loop else None
+
+        # The ring buffer holding the captured frames (together with the time they were captured) and the condition
+        # used to synchronize the reader thread and the consumer.
+        self.frames = deque()
+        self.condition = threading.Condition()
+
+        # Some statistics.
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        # The time (time.perf_counter()) the frame returned by the last read() was captured.
+        self.timestamp = 0
+
+        self.running = False
+        self.ended = False
+        self.thread = None
+        self.video_capture = cv2.VideoCapture(source)
+
+        # The settings requested from a camera (resolution, FPS, format, buffer of the driver) and the values the
+        # driver actually uses.
+        self.rejected_camera_settings = []
+        if camera_settings is not None and self.video_capture.isOpened():
+            self.rejected_camera_settings = apply_camera_settings(
+                self.video_capture, camera_settings
+            )
+        self.camera_properties = (
+            get_camera_properties(self.video_capture)
+            if self.video_capture.isOpened()
+            else None
+        )
+
+    def is_opened(self):
+        return self.video_capture.isOpened()
+
+    def get_fps(self):
+        """
+        Returns the FPS reported by the source or 0 if the source does not report it.
+        """
+        fps = self.video_capture.get(cv2.CAP_PROP_FPS)
+        return fps if fps > 0 else 0
+
+    def get_frame_counts(self):
+        """
+        Returns the numbers of the captured, dropped and queued frames. They are updated by the reader thread, so
+        they are read under the lock of the ring buffer.
+        """
+        with self.condition:
+            return self.frames_captured, self.frames_dropped, len(self.frames)
+
+    def has_frame(self):
+        """
+        Returns True if read() would return a frame without waiting.
+        """
+        with self.condition:
+            return len(self.frames) > 0
+
+    def is_ended(self):
+        """
+        Returns True if the source ended (and will not be restarted) and all of its frames were read.
+        """
+        with self.condition:
+            return not self.frames and (self.ended or not self.running)
+
+    def start(self):
+        """
+        Starts the reader thread.
+        """
+        if self.running:
+            return
+        self.running = True
+        self.ended = False
+        self.thread = threading.Thread(target=self.__reader, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the reader thread and releases the video capture.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.video_capture.release()
+        if self.loop_cache is not None:
+            self.loop_cache.drop()
+
+    def read(self):
+        """
+        Returns the next frame in the same way as cv2.VideoCapture.read() does. Blocks until a new frame is available.
+        If the source ended (and will not be restarted), (False, None) is returned.
+        """
+        with self.condition:
+            while not self.frames and self.running and not self.ended:
+                self.condition.wait()
+            if not self.frames:
+                return False, None
+            if self.policy == CapturePolicy.LATEST:
+                # Only the freshest frame is of interest, all the older ones are dropped.
+                self.timestamp, frame = self.frames.pop()
+                self.frames_dropped += len(self.frames)
+                self.frames.clear()
+            else:
+                self.timestamp, frame = self.frames.popleft()
+                # The reader thread may wait for some space in the buffer.
+                self.condition.notify_all()
+            return True, frame
+
+    def __reader(self):
+        """
+        The loop of the reader thread. It reads the frames from the source and puts them into the ring buffer.
+        """
+        while self.running:
+            ret, frame = self.video_capture.read()
+            timestamp = time.perf_counter()
+            if ret and self.loop_cache is not None:
+                self.loop_cache.add(frame)
+            if not ret and self.loop:
+                if self.loop_cache is not None:
+                    self.loop_cache.finish()
+                    if self.loop_cache.complete:
+                        # The video is decoded completely, from now on it is replayed from the cache.
+                        fps = self.get_fps()
+                        self.video_capture.release()
+                        self.__replay(fps)
+                        return
+                # The video ended. Reload the video.
+                self.video_capture.release()
+                self.video_capture = cv2.VideoCapture(self.source)
+                if self.video_capture.isOpened():
+                    continue
+            if not ret:
+                with self.condition:
+                    self.ended = True
+                    self.condition.notify_all()
+                return
+
+            if not self.__put(timestamp, frame, self.policy == CapturePolicy.LOSSLESS):
+                return
+
+    def __replay(self, fps):
+        """
+        The loop of the reader thread once the frames of the video are in the loop cache.
+        Replaying is much faster than decoding, so under the LATEST policy the frames are delivered at the FPS of
+        the video, like a camera would deliver them, instead of overwriting the buffer in a tight loop. If the video
+        does not report its FPS, the reader thread waits for space in the buffer as under the LOSSLESS policy.
+        """
+        frame_interval = 1 / fps if self.policy == CapturePolicy.LATEST and fps > 0 else 0
+        time_next = time.perf_counter()
+        idx = 0
+        while self.running:
+            if frame_interval > 0:
+                with self.condition:
+                    while self.running and time.perf_counter() < time_next:
+                        self.condition.wait(time_next - time.perf_counter())
+                # If the thread fell behind, continue from now instead of catching up with a burst of frames.
+                time_next = max(time_next + frame_interval, time.perf_counter())
+            if not self.__put(time.perf_counter(), self.loop_cache[idx], frame_interval == 0):
+                return
+            idx = (idx + 1) % len(self.loop_cache)
+
+    def __put(self, timestamp, frame, lossless):
+        """
+        Puts a frame into the ring buffer. If lossless is set, it waits for space in the buffer, otherwise the
+        oldest frame is dropped. Returns False if the reader thread was stopped in the meantime.
+        """
+        with self.condition:
+            if lossless:
+                # Wait until the consumer made some space in the buffer.
+                while len(self.frames) >= self.buffer_size and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return False
+            elif len(self.frames) >= self.buffer_size:
+                # Drop the oldest frame.
+                self.frames.popleft()
+                self.frames_dropped += 1
+            self.frames.append((timestamp, frame))
+            self.frames_captured += 1
+            self.condition.notify_all()
+            return True
@@ -0,0 +1,62 @@
+import time
+from enum import Enum
+
+
+class PacingMode(Enum):
+    SOURCE = 1
+    UNLIMITED = 2
+    TARGET = 3
+
+    def __str__(self):
+        if self == PacingMode.SOURCE:
+            return "source"
+        elif self == PacingMode.UNLIMITED:
+            return "unlimited"
+        else:
+            return "target"
+
+
+class FramePacer:
+    """
+    Paces a source to a given frame rate. Instead of blocking the loop, it acts as a gate: the next frame is only
+    started once the budget of the current frame is used up (see is_due()), so several sources can be paced by the
+    same loop.
+    - SOURCE: match the FPS reported by the source (unlimited if the source does not report its FPS).
+    - UNLIMITED: run as fast as possible.
+    - TARGET: hold the given target FPS.
+    """
+
+    def __init__(self, mode=PacingMode.SOURCE, source_fps=0, target_fps=0):
+        self.mode = mode
+        if mode == PacingMode.SOURCE and source_fps > 0:
+            self.frame_duration = 1 / source_fps
+        elif mode == PacingMode.TARGET and target_fps > 0:
+            self.frame_duration = 1 / target_fps
+        else:
+            self.frame_duration = 0
+
+        # The start of the current frame. Its deadline is one frame duration later.
+        self.frame_start = time.perf_counter()
+        self.last_frame_end = self.frame_start
+        # The FPS actually reached (exponentially smoothed).
+        self.fps = 0
+
+    def is_due(self):
+        """
+        Returns True if the budget of the current frame is used up, i.e. the next frame may start.
+        """
+        return time.perf_counter() >= self.frame_start + self.frame_duration
+
+    def next_frame(self):
+        """
+        Starts the next frame. Call this when the frame is started after is_due() returned True.
+        """
+        now = time.perf_counter()
+        frame_time = now - self.last_frame_end
+        self.last_frame_end = now
+        if frame_time > 0:
+            self.fps = 0.9 * self.fps + 0.1 / frame_time
+        # Schedule from the previous deadline so that the delays of the polling loop do not accumulate. If we are
+        # already more than one frame behind, there is no use in catching up, so restart the schedule.
+        deadline = self.frame_start + self.frame_duration
+        self.frame_start = deadline if now - deadline < self.frame_duration else now
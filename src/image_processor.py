@@ -1,43 +1,99 @@
+from algorithms.properties import get_halo, is_stateful
+from buffer_pool import BufferPool
+from change_detector import ChangeDetector
+from frame_cache import FrameCache
+from incremental_processor import IncrementalProcessor
+
+
 class ImageProcessor:
-    def __init__(self, functions, selected_idx=0, print_markdown_table=False):
+    def __init__(
+        self,
+        functions,
+        selected_idx=0,
+        settings=None,
+        tiled_executor=None,
+        change_tolerance=None,
+        incremental_tolerance=None,
+    ):
         self.functions = functions
+        # Settings of the algorithms (e.g. given on the command line), see get_setting in algorithms/properties.py.
+        self.settings = settings if settings is not None else dict()
         self.selected_idx = (
             selected_idx if selected_idx >= 0 and selected_idx < len(functions) else 0
         )
-        self.algorithm_names = self.__get_algorithm_names()
-        if print_markdown_table:
-            self.print_markdown_table()
-
-    def __get_algorithm_names(self):
-        algorithm_names = []
-        for function in self.functions:
-            # Send an empty dictionary to the function so that it will only return the algorithms name.
-            params = function({})
-            algorithm_names.append(params["algorithm_name"])
-        return algorithm_names
+        # The names are declared by the algorithms (see Algorithm), so they are known without importing them.
+        self.algorithm_names = [function.name for function in functions]
+        # The products derived from the frames (grayscale, blurred, ...) are shared by the algorithms. They and the
+        # results of the algorithms are written into preallocated buffers.
+        self.buffer_pool = BufferPool()
+        # If a tiled executor is given, the neighborhood filters run in parallel strips of the frame.
+        self.tiled_executor = tiled_executor
+        self.frame_cache = FrameCache(
+            buffer_pool=self.buffer_pool, tiled_executor=tiled_executor
+        )
+        # If a tolerance is given, the frames that did not change since the last processed frame are not processed
+        # again by stateless algorithms, their last result is reused.
+        self.change_detector = (
+            ChangeDetector(change_tolerance) if change_tolerance is not None else None
+        )
+        self.frames_skipped = 0
+        # If a tolerance is given, the algorithms that support it (see the halo decorator) only process the parts of
+        # the frame that changed.
+        self.incremental_processor = (
+            IncrementalProcessor(tolerance=incremental_tolerance, settings=self.settings)
+            if incremental_tolerance is not None
+            else None
+        )
 
     def process(self, params):
         function = self.functions[self.selected_idx]
-        params = function(params)
+        # The last result can only be reused if it was computed by the same algorithm.
+        if params.get("algorithm_name") == self.algorithm_names[
+            self.selected_idx
+        ] and self.is_unchanged(params["frame_curr"], [function]):
+            return params
+
+        params["algorithm_name"] = self.algorithm_names[self.selected_idx]
+        if self.incremental_processor is not None and get_halo(function) is not None:
+            params["frame_result"] = self.incremental_processor.process(
+                function, params["frame_curr"]
+            )
+        else:
+            self.frame_cache.update(params["frame_prev"], params["frame_curr"])
+            params["frame_cache"] = self.frame_cache
+            params["buffer_pool"] = self.buffer_pool
+            params["settings"] = self.settings
+            params["tiled_executor"] = self.tiled_executor
+            params = function(params)
+        if self.change_detector is not None and not is_stateful(function):
+            self.change_detector.accept(params["frame_curr"])
         return params
 
+    def is_unchanged(self, frame_curr, functions):
+        """
+        Returns True if the frame did not change since the last processed frame and none of the functions is
+        stateful, so the last result of the functions can be reused. The skipped frames are counted.
+        """
+        if self.change_detector is None or any(
+            is_stateful(function) for function in functions
+        ):
+            return False
+        if self.change_detector.is_changed(frame_curr):
+            return False
+        self.frames_skipped += 1
+        return True
+
+    def get_selected_function(self):
+        return self.functions[self.selected_idx]
+
+    def is_selected_stateful(self):
+        """
+        Returns True if the selected algorithm keeps a state from one frame to the next.
+        """
+        return is_stateful(self.functions[self.selected_idx])
+
     def next_algorithm(self):
         self.selected_idx = (self.selected_idx + 1) % len(self.functions)
 
     def prev_algorithm(self):
         self.selected_idx = (self.selected_idx - 1) % len(self.functions)
-
-    def print_markdown_table(self):
-        """
-        This function prints the currently available algorithms with their respective
-        ID and description in a markdown table so that it can be easily copy pasted
-        into the repositories README.
-        """
-        print(
-            "Available algorithms and their IDs in a markdown table for the README:\n"
-        )
-        print("| ID | algorithm |")
-        print("| :---: | :--- |")
-        for idx, algorithm_name in enumerate(self.algorithm_names):
-            print(f"| `{idx}` | {algorithm_name} |")
-        print("\n")
@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+
+from algorithms.properties import get_halo
+
+
+class IncrementalProcessor:
+    """
+    Applies a stateless algorithm only to the parts of the frame that changed and patches their results into a
+    persistent result buffer.
+    The frame is split into a grid of tiles. A tile is dirty if one of its pixels differs by more than the tolerance
+    from the reference frame (the frame the current result belongs to). The dirty tiles are merged into rectangles.
+    The results within the halo of the algorithm (see the halo decorator) around a rectangle change too, so the
+    rectangle extended by the halo is recomputed, from the pixels within another halo around it, and patched into the
+    result. Since the halo covers the kernels of the algorithm, the patched result is identical to the result of the
+    full frame. Algorithms whose result is not bounded by a radius (like the hysteresis of canny) have no halo and
+    are not supported. If most of the frame changed, the full frame is processed.
+    """
+
+    def __init__(self, tile_size=32, tolerance=0, max_dirty_fraction=0.5, settings=None):
+        self.tile_size = tile_size
+        self.tolerance = tolerance
+        self.max_dirty_fraction = max_dirty_fraction
+        self.settings = settings
+        self.function = None
+        self.frame_reference = None
+        self.result = None
+        # The buffer of the difference between the frame and the reference frame.
+        self.diff = None
+        # The fraction of the tiles processed for the last frame.
+        self.dirty_fraction = 1.0
+
+    def process(self, function, frame_curr):
+        """
+        Returns the result of the algorithm for the frame. The result is kept and patched with the next frames, so
+        it is only valid until the next call.
+        """
+        if (
+            function is not self.function
+            or self.frame_reference is None
+            or self.frame_reference.shape != frame_curr.shape
+        ):
+            return self.__process_full(function, frame_curr)
+
+        dirty = self.__get_dirty_tiles(frame_curr)
+        self.dirty_fraction = float(dirty.mean())
+        if self.dirty_fraction == 0:
+            return self.result
+        if self.dirty_fraction > self.max_dirty_fraction:
+            return self.__process_full(function, frame_curr)
+
+        # Merge the dirty tiles into rectangles (the bounding boxes of the connected groups of dirty tiles).
+        halo = get_halo(function)
+        height, width = frame_curr.shape[:2]
+        count, _, stats, _ = cv2.connectedComponentsWithStats(
+            dirty.view(np.uint8), connectivity=8
+        )
+        for x, y, w, h, _ in stats[1:count]:
+            # The changed pixels.
+            x0, y0 = x * self.tile_size, y * self.tile_size
+            x1, y1 = min(width, (x + w) * self.tile_size), min(height, (y + h) * self.tile_size)
+            # The results within the halo around the changed pixels change as well.
+            rx0, ry0 = max(0, x0 - halo), max(0, y0 - halo)
+            rx1, ry1 = min(width, x1 + halo), min(height, y1 + halo)
+            # And these results depend on the pixels within the halo around them.
+            hx0, hy0 = max(0, rx0 - halo), max(0, ry0 - halo)
+            hx1, hy1 = min(width, rx1 + halo), min(height, ry1 + halo)
+            result = self.__apply(function, frame_curr[hy0:hy1, hx0:hx1])
+            self.result[ry0:ry1, rx0:rx1] = result[
+                ry0 - hy0 : ry1 - hy0, rx0 - hx0 : rx1 - hx0
+            ]
+            self.frame_reference[y0:y1, x0:x1] = frame_curr[y0:y1, x0:x1]
+        return self.result
+
+    def __process_full(self, function, frame_curr):
+        self.function = function
+        self.result = np.array(self.__apply(function, frame_curr))
+        self.frame_reference = frame_curr.copy()
+        self.dirty_fraction = 1.0
+        return self.result
+
+    def __apply(self, function, frame):
+        # The algorithm is called without frame cache and buffers, since it only gets a part of the frame.
+        return function({"frame_prev": frame, "frame_curr": frame, "settings": self.settings})[
+            "frame_result"
+        ]
+
+    def __get_dirty_tiles(self, frame_curr):
+        """
+        Returns a boolean grid with the tiles that changed.
+        """
+        # The difference is written into a buffer padded to whole tiles (the padding stays zero), then the maximum of
+        # every tile can be taken with two reductions over the rows and the columns (including the channels) of the
+        # tiles, which is much faster than np.max over the channels followed by np.maximum.reduceat.
+        height, width = frame_curr.shape[:2]
+        rows = -(-height // self.tile_size)
+        columns = -(-width // self.tile_size)
+        shape = (rows * self.tile_size, columns * self.tile_size) + frame_curr.shape[2:]
+        if self.diff is None or self.diff.shape != shape:
+            self.diff = np.zeros(shape, dtype=np.uint8)
+        cv2.absdiff(frame_curr, self.frame_reference, dst=self.diff[:height, :width])
+        tile_max = (
+            self.diff.reshape(rows, self.tile_size, -1)
+            .max(axis=1)
+            .reshape(rows, columns, -1)
+            .max(axis=2)
+        )
+        return tile_max > self.tolerance
@@ -0,0 +1,82 @@
+import numpy as np
+import os
+
+
+class LoopCache:
+    """
+    Keeps the decoded frames of the first pass of a looping video, so that the following passes are replayed without
+    decoding the video again (no hitch at the wrap-around and exactly the same frames in every pass).
+    The frames are kept in memory or, if a filename is given, in a memory-mapped raw frame file, which is useful for
+    longer videos. If the frames do not fit into max_bytes, the cache is dropped and the video is decoded as usual.
+    """
+
+    def __init__(self, max_bytes, filename=None):
+        self.max_bytes = max_bytes
+        self.filename = filename
+        self.frames = []
+        self.memmap = None
+        self.length = 0
+        self.nbytes = 0
+        # The cache is complete when the first pass ended, it is dropped if the video does not fit into it.
+        self.complete = False
+        self.dropped = False
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, idx):
+        if self.memmap is not None:
+            return self.memmap[idx]
+        return self.frames[idx]
+
+    def add(self, frame):
+        """
+        Adds the next frame of the first pass. Returns False if the frame does not fit, then the cache is dropped.
+        """
+        if self.dropped:
+            return False
+        if (
+            self.nbytes + frame.nbytes > self.max_bytes
+            or (self.length > 0 and frame.shape != self[0].shape)
+        ):
+            self.drop()
+            return False
+        if self.filename is not None:
+            if self.memmap is None:
+                # The file is allocated for as many frames as fit into the size limit.
+                self.memmap = np.memmap(
+                    self.filename,
+                    dtype=frame.dtype,
+                    mode="w+",
+                    shape=(self.max_bytes // frame.nbytes,) + frame.shape,
+                )
+            self.memmap[self.length] = frame
+        else:
+            # The frames of cv2.VideoCapture.read() are new arrays, so no copy is needed.
+            self.frames.append(frame)
+        self.length += 1
+        self.nbytes += frame.nbytes
+        return True
+
+    def finish(self):
+        """
+        Marks the end of the first pass, from now on the frames are replayed from the cache.
+        """
+        self.complete = not self.dropped and self.length > 0
+
+    def drop(self):
+        """
+        Frees the cached frames (and removes the raw frame file).
+        """
+        self.dropped = True
+        self.complete = False
+        self.frames = []
+        self.length = 0
+        self.nbytes = 0
+        if self.memmap is not None:
+            # Frames that are still in use keep the mapping alive, so only the reference is dropped.
+            self.memmap = None
+            try:
+                os.remove(self.filename)
+            except OSError:
+                pass
@@ -1,18 +1,20 @@
-from algorithms.binarization import (
-    binarize_global_threshold,
-    binarize_adaptive_mean_threshold,
-    binarize_adaptive_gauss_threshold,
+from algorithms import get_algorithms, print_markdown_table
+
+from argument_parser import (
+    get_algorithm_settings,
+    get_args,
+    get_camera_settings,
+    get_source_filename,
+    get_sources,
 )
-from algorithms.edge_detection import sobel_x, sobel_y, sobel_xy, canny
-from algorithms.grayscale import grayscale
-from algorithms.optical_flow import optical_flow
-from algorithms.original import original
-
-from argument_parser import get_args
-from image_processor import ImageProcessor
+from collections import deque
 import curses
-import cv2
+import os
 import sys
+import time
+
+# OpenCV and the modules using it are only imported by the functions that need them, so that the commands that only
+# print informations (like '--print-markdown-table') exit without loading them.
 
 
 # =========================================================================================
@@ -31,16 +33,103 @@ CV2_WINDOW_NAME_PROCESSED = "processed camera stream"
 class StdOutWrapper:
     """
     This code was taken from: https://stackoverflow.com/a/14010948
+    The captured lines are kept in a ring of fixed size, so writing does not get slower with the amount of output.
     """
 
-    text = ""
+    def __init__(self, max_lines=30):
+        self.lines = deque(maxlen=max_lines)
+        # The last line, which has not been terminated yet.
+        self.line = ""
 
     def write(self, txt):
-        self.text += txt
-        self.text = "\n".join(self.text.split("\n")[-30:])
+        *lines, self.line = (self.line + txt).split("\n")
+        self.lines.extend(lines)
+
+    def flush(self):
+        pass
 
     def get_text(self):
-        return "\n".join(self.text.split("\n"))
+        return "".join(line + "\n" for line in self.lines) + self.line
+
+
+# =========================================================================================
+#       TERMINAL UI
+# =========================================================================================
+
+
+def get_stats_lines(stage_timer):
+    """
+    This function returns the lines showing the durations of the stages of the main loop.
+    """
+    summary = stage_timer.get_summary()
+    width = max([10] + [len(stage) for stage, _, _, _ in summary])
+    lines = [f"{'stage':<{width}}\tlast\t\tp50\t\tp99"]
+    for stage, last, p50, p99 in summary:
+        lines.append(
+            f"{stage:<{width}}\t{last * 1000:6.1f} ms\t{p50 * 1000:6.1f} ms\t{p99 * 1000:6.1f} ms"
+        )
+    return lines
+
+
+def get_source_stats_lines(pipeline, show_name, recording_sinks):
+    """
+    This function returns the lines showing the settings and statistics of the frame capture, the FPS and the
+    recordings of a source.
+    """
+    from camera_settings import format_camera_properties
+
+    frame_capture = pipeline.frame_capture
+    frame_pacer = pipeline.frame_pacer
+    quality_controller = pipeline.quality_controller
+    frames_captured, frames_dropped, frames_queued = frame_capture.get_frame_counts()
+    lines = [
+        f"captured: {frames_captured}\tdropped: {frames_dropped}"
+        f"\tqueued: {frames_queued} ({frame_capture.policy})"
+        + (
+            f"\tloop cache: {len(frame_capture.loop_cache)} frames"
+            + (" (complete)" if frame_capture.loop_cache.complete else "")
+            if frame_capture.loop_cache is not None
+            and not frame_capture.loop_cache.dropped
+            else ""
+        ),
+        f"fps: {frame_pacer.fps:.1f} ({frame_pacer.mode})"
+        + (
+            f"\tskipped (static): {pipeline.image_processor.frames_skipped}"
+            if pipeline.image_processor.change_detector is not None
+            else ""
+        )
+        + (
+            f"\tprocessed tiles: {pipeline.image_processor.incremental_processor.dirty_fraction * 100:.0f} %"
+            if pipeline.image_processor.incremental_processor is not None
+            else ""
+        )
+        + (
+            f"\tscale: {quality_controller.get_scale():.2f}"
+            if quality_controller is not None
+            else ""
+        ),
+    ]
+    if frame_capture.camera_properties is not None:
+        lines.insert(
+            0,
+            "source: "
+            + format_camera_properties(
+                frame_capture.camera_properties, frame_capture.rejected_camera_settings
+            ),
+        )
+    if recording_sinks:
+        lines.append(
+            "recording: "
+            + "\t".join(
+                f"{stream} (failed to open {sink.filename}, dropped: {sink.frames_dropped})"
+                if sink.failed
+                else f"{stream} (queued: {sink.get_queue_depth()}, dropped: {sink.frames_dropped})"
+                for stream, sink in recording_sinks.items()
+            )
+        )
+    if show_name:
+        lines.insert(0, f"{pipeline.name}:")
+    return lines
 
 
 # =========================================================================================
@@ -50,141 +139,413 @@ class StdOutWrapper:
 
 def main(stdscr):
     """
-    This function creates the needed OpenCV video stream and handles the input and UI
+    This function creates the needed OpenCV video streams and handles the input and UI
     using curses.
     """
+    from concurrent.futures import ThreadPoolExecutor
+    import cv2
+
+    from frame_capture import CapturePolicy
+    from frame_pacer import PacingMode
+    from image_processor import ImageProcessor
+    from loop_cache import LoopCache
+    from mjpeg_server import MjpegServer
+    from offline_processing import DEFAULT_OUTPUT_FPS
+    from recording_sink import RecordingSink
+    from source_pipeline import SourcePipeline
+    from stage_timer import StageTimer
+    from terminal_ui import TerminalUI
+    from tiled_executor import TiledExecutor
+
     # Parse the arguments / get the settings.
     args = get_args()
-
-    # Create the image processor and the parameter dictionary.
-    image_processor = ImageProcessor(
-        [
-            original,
-            grayscale,
-            binarize_global_threshold,
-            binarize_adaptive_mean_threshold,
-            binarize_adaptive_gauss_threshold,
-            sobel_x,
-            sobel_y,
-            sobel_xy,
-            canny,
-            optical_flow,
-        ],
-        args.selected_idx,
-        args.print_markdown_table,
+    algorithms = get_algorithms(args.pipelines)
+    settings = get_algorithm_settings(args)
+    tiled_executor = (
+        TiledExecutor(args.tile_threads) if args.tile_threads is not None else None
     )
 
-    # We will pass the parameters to the image processor. These will contain the current and
-    # previous image as well as some other parameters, that may be needed by some functions.
-    # Some things that will definitly be contained by the params dictionary:
+    # This image processor only holds the names and the selection of the algorithms shown in the UI, every source
+    # has its own one.
+    image_processor = ImageProcessor(algorithms, args.selected_idx, settings)
+
+    # Every source (camera or video) is processed in its own pipeline with its own algorithm state. The frames of
+    # all sources are processed on one shared worker pool.
+    # The params of the pipelines will contain the current and previous image as well as some other parameters,
+    # that may be needed by some functions. Some things that will definitly be contained by the params dictionary:
     # - frame_prev (holding the previous frame)
     # - frame_curr (holding the current frame)
     # - frame_result (holding whatever result frame is obtained by the current algorithm)
     # - algorithm_name (the name of the current algorithm)
-    params = dict()
-
-    # Initialize the windows and the camera stream.
-    if not args.hide_original_stream:
-        cv2.namedWindow(CV2_WINDOW_NAME_ORIGINAL)
-    cv2.namedWindow(CV2_WINDOW_NAME_PROCESSED)
+    # - frame_cache (the products derived from the frames, shared by the algorithms)
+    # - buffer_pool (the reusable buffers for the results of the algorithms)
+    # If several algorithms shall be compared, they all run on the same frame and their results are shown in a
+    # mosaic.
+    # The decoded frames of a looping video can be kept, so that it is not decoded again in every pass.
+    sources = get_sources(args)
+    pipelines = [
+        SourcePipeline(
+            name,
+            source,
+            is_video,
+            algorithms,
+            image_processor.selected_idx,
+            settings,
+            tiled_executor,
+            args.static_tolerance,
+            args.incremental_tolerance,
+            CapturePolicy[args.capture_policy.upper()]
+            if args.capture_policy is not None
+            else None,
+            args.capture_buffer_size,
+            PacingMode[args.pacing.upper()] if args.pacing is not None else None,
+            args.target_fps,
+            args.latency_budget / 1000 if args.latency_budget is not None else None,
+            args.mosaic,
+            LoopCache(
+                int(args.loop_cache_mb * 2**20),
+                get_source_filename(args.loop_cache_file, idx, len(sources))
+                if args.loop_cache_file is not None
+                else None,
+            )
+            if is_video and args.loop_cache_mb is not None
+            else None,
+            get_camera_settings(args),
+        )
+        for idx, (name, source, is_video) in enumerate(sources)
+    ]
+    executor = ThreadPoolExecutor(
+        max_workers=args.workers
+        if args.workers is not None
+        else min(len(pipelines), os.cpu_count())
+    )
 
-    # If a path to a video file is given, use this, otherwise, use the camera.
-    video_capture = cv2.VideoCapture(
-        args.filename_video if args.filename_video is not None else args.device_id
+    # Every source gets its own windows. With a single source, the windows and stages keep their plain names.
+    def get_label(pipeline, text):
+        return f"{text} ({pipeline.name})" if len(pipelines) > 1 else text
+
+    # Initialize the windows.
+    for pipeline in pipelines:
+        if not args.hide_original_stream:
+            cv2.namedWindow(get_label(pipeline, CV2_WINDOW_NAME_ORIGINAL))
+        cv2.namedWindow(get_label(pipeline, CV2_WINDOW_NAME_PROCESSED))
+
+    # Measure how long every stage of the main loop takes, so we can tell whether a slowdown comes from the
+    # camera, the algorithm or the GUI.
+    stage_timer = StageTimer(trace=args.trace_file is not None)
+
+    # If a port is given, the processed frames are also served as MJPEG stream.
+    mjpeg_server = (
+        MjpegServer(args.mjpeg_port, len(pipelines))
+        if args.mjpeg_port is not None
+        else None
     )
 
-    if video_capture.isOpened():
-        # Create the terminal UI using curses.
-        curses.start_color()
-        curses.init_pair(
-            1, curses.COLOR_BLACK, curses.COLOR_WHITE
-        )  # Black text on white background
-        curses.init_pair(
-            2, curses.COLOR_WHITE, curses.COLOR_BLACK
-        )  # White text on black background (for selection)
-        # Set the entire background to white
-        stdscr.bkgd(" ", curses.color_pair(1))
-        stdscr.clear()
-        # Turn off cursor blinking
-        curses.curs_set(0)
-        # Otherwise, opencvs window will not open:
-        stdscr.nodelay(1)
-
-        # Capture the first image.
-        ret, frame_prev = video_capture.read()
-        if not ret:
-            print("There was an error capturing the first image.")
+    # The original and processed frames of every source can be recorded while running. The frames are written on
+    # a writer thread per recording.
+    recording_sinks = [
+        {
+            stream: RecordingSink(
+                get_source_filename(filename, idx, len(pipelines)),
+                args.output_fourcc,
+                pipeline.frame_capture.get_fps() or DEFAULT_OUTPUT_FPS,
+            )
+            for stream, filename in (
+                ("original", args.record_original),
+                ("processed", args.record_processed),
+            )
+            if filename is not None
+        }
+        for idx, pipeline in enumerate(pipelines)
+    ]
+
+    if all(pipeline.is_opened() for pipeline in pipelines):
+        for pipeline in pipelines:
+            pipeline.start()
+        if mjpeg_server is not None:
+            mjpeg_server.start()
+        for sinks in recording_sinks:
+            for sink in sinks.values():
+                sink.start()
+
+        # The terminal UI is drawn on its own thread. It shows the algorithms and the statistics of every source.
+        def get_lines():
+            lines = [
+                (f"{idx:03d}\t{algorithm_name}", idx == image_processor.selected_idx)
+                for idx, algorithm_name in enumerate(image_processor.algorithm_names)
+            ]
+            for pipeline, sinks in zip(pipelines, recording_sinks):
+                lines.append(("", False))
+                lines.extend(
+                    (line, False)
+                    for line in get_source_stats_lines(pipeline, len(pipelines) > 1, sinks)
+                )
+            lines.append(("", False))
+            lines.extend((line, False) for line in get_stats_lines(stage_timer))
+            return lines
+
+        terminal_ui = TerminalUI(stdscr, get_lines, stage_timer)
+        terminal_ui.start()
+
+        # The results are shown at most with the display FPS, the time when the next result of every source may be
+        # shown.
+        display_interval = 1 / args.display_fps if args.display_fps is not None else 0
+        next_display = [0] * len(pipelines)
+
+        # The pipeline that is allowed to submit its frame first, it changes every round so that no source is
+        # always in front of the others in the queue of the worker pool.
+        first_idx = 0
         while True:
-            # Handle the terminal UI.
-            stdscr.clear()
-
-            # Display the list of items
-            for idx, algorithm_name in enumerate(image_processor.algorithm_names):
-                item = f"{idx:03d}\t{algorithm_name}"
-                if idx == image_processor.selected_idx:
-                    stdscr.addstr(idx, 0, item, curses.color_pair(2))
-                else:
-                    stdscr.addstr(idx, 0, item, curses.color_pair(1))
-
-            # Refresh the screen
-            stdscr.refresh()
-
-            # Capture the image.
-            ret, frame_curr = video_capture.read()
-            if not ret and args.filename_video is not None:
-                # The video ended. Reload the video.
-                video_capture.release()
-                video_capture = cv2.VideoCapture(args.filename_video)
-                continue
-            elif not ret:
+            # Start the processing of every source that has a new frame. A source has at most one frame in flight.
+            for idx in range(len(pipelines)):
+                pipeline = pipelines[(first_idx + idx) % len(pipelines)]
+                if pipeline.is_ready():
+                    pipeline.submit(executor, stage_timer, get_label(pipeline, ""))
+            first_idx = (first_idx + 1) % len(pipelines)
+
+            # Show the results of the sources that are done.
+            for pipeline_idx, pipeline in enumerate(pipelines):
+                if pipeline.future is None or not pipeline.future.done():
+                    continue
+                frame_curr, frame_result, timestamp = pipeline.collect()
+                # The results in between are only skipped for the windows, they are still streamed and recorded.
+                now = time.perf_counter()
+                if now >= next_display[pipeline_idx]:
+                    next_display[pipeline_idx] = max(
+                        now, next_display[pipeline_idx] + display_interval
+                    )
+                    with stage_timer.measure(get_label(pipeline, "display"), pipeline.name):
+                        # Display the original image.
+                        if not args.hide_original_stream:
+                            cv2.imshow(
+                                get_label(pipeline, CV2_WINDOW_NAME_ORIGINAL), frame_curr
+                            )
+                        # Display the processed image.
+                        cv2.imshow(get_label(pipeline, CV2_WINDOW_NAME_PROCESSED), frame_result)
+                # The encoding happens on the encoder thread of the server.
+                if mjpeg_server is not None:
+                    mjpeg_server.submit(frame_result, pipeline_idx)
+                # The recordings are written on their writer threads.
+                sinks = recording_sinks[pipeline_idx]
+                if "original" in sinks:
+                    sinks["original"].submit(frame_curr)
+                if "processed" in sinks:
+                    sinks["processed"].submit(frame_result)
+                stage_timer.record(
+                    get_label(pipeline, "latency"), time.perf_counter() - timestamp, pipeline.name
+                )
+                stage_timer.next_frame(pipeline.name)
+
+            # A video will be restarted by the frame capture when it ended, so this only happens if the cameras
+            # fail.
+            if all(pipeline.is_ended() for pipeline in pipelines):
                 break
 
-            # Update the parameters for the image processor.
-            params["frame_prev"] = frame_prev
-            params["frame_curr"] = frame_curr
-
-            # Process the image.
-            params = image_processor.process(params)
-
-            # Display the original image.
-            if not args.hide_original_stream:
-                cv2.imshow(CV2_WINDOW_NAME_ORIGINAL, params["frame_curr"])
-
-            # Display the processed image.
-            cv2.imshow(CV2_WINDOW_NAME_PROCESSED, params["frame_result"])
-
-            # Update the previous frame.
-            frame_prev = frame_curr
-
-            # Wait for user input
-            key = stdscr.getch()
+            # Handle the user input, the keys are read by the terminal UI.
+            key = terminal_ui.get_key()
 
             # Handle the arrow keys.
             if key == curses.KEY_UP or key == ord("j"):
-                # Drop the params, since they may contain further informations from the previous algorithm.
-                params = dict()
                 image_processor.next_algorithm()
+                for pipeline in pipelines:
+                    pipeline.select_algorithm(image_processor.selected_idx)
+                terminal_ui.request_redraw()
             elif key == curses.KEY_DOWN or key == ord("k"):
-                # Drop the params, since they may contain further informations from the previous algorithm.
-                params = dict()
                 image_processor.prev_algorithm()
+                for pipeline in pipelines:
+                    pipeline.select_algorithm(image_processor.selected_idx)
+                terminal_ui.request_redraw()
             elif key == ord("r"):
                 # Refresh the algorithm. This means, we simply delete all the parameters since they store settings
                 # some algorithm may use. We force these algorithms to restart.
-                params = dict()
+                for pipeline in pipelines:
+                    pipeline.reset()
             elif key == ord("q") or key == 27:
                 break  # Exit the loop if 'q' or 'ESC' is pressed
 
-            # Use OpenCV's waitKey for timing but not for input.
-            cv2.waitKey(50)
+            # Use OpenCV's waitKey for timing but not for input. The sources are paced by their own frame pacers,
+            # so only wait 1 ms, which OpenCV needs to handle its window events.
+            with stage_timer.measure("wait"):
+                cv2.waitKey(1)
+        terminal_ui.stop()
     else:
         print("Cannot open video stream.")
 
-    # Terminate the windows and the camera stream.
-    if not args.hide_original_stream:
-        cv2.destroyWindow(CV2_WINDOW_NAME_ORIGINAL)
-    cv2.destroyWindow(CV2_WINDOW_NAME_PROCESSED)
-    video_capture.release()
+    # Terminate the windows and the streams.
+    for pipeline in pipelines:
+        if not args.hide_original_stream:
+            cv2.destroyWindow(get_label(pipeline, CV2_WINDOW_NAME_ORIGINAL))
+        cv2.destroyWindow(get_label(pipeline, CV2_WINDOW_NAME_PROCESSED))
+    executor.shutdown()
+    for pipeline in pipelines:
+        pipeline.stop()
+    if mjpeg_server is not None:
+        mjpeg_server.stop()
+    for sinks in recording_sinks:
+        for sink in sinks.values():
+            sink.stop()
+    if args.trace_file is not None:
+        stage_timer.export_trace(args.trace_file)
+    if tiled_executor is not None:
+        tiled_executor.close()
+
+
+# =========================================================================================
+#       HEADLESS VIDEO PROCESSING
+# =========================================================================================
+
+
+def main_headless(args):
+    """
+    This function processes the given videos once (one after the other) with the selected algorithm without any UI
+    and reports the throughput.
+    """
+    from image_processor import ImageProcessor
+    from offline_processing import process_video
+    from tiled_executor import TiledExecutor
+
+    image_processor = ImageProcessor(
+        get_algorithms(args.pipelines),
+        args.selected_idx,
+        get_algorithm_settings(args),
+        TiledExecutor(args.tile_threads) if args.tile_threads is not None else None,
+        args.static_tolerance,
+        args.incremental_tolerance,
+    )
+    if args.filename_video is None:
+        print("The headless mode needs a video (see the '-f' argument).")
+        return
+    if args.filename_output is not None and len(args.filename_video) > 1:
+        print("The results of several videos cannot be written into one output video.")
+        return
+
+    if (
+        args.processes > 1
+        and args.warmup_frames <= 0
+        and image_processor.is_selected_stateful()
+    ):
+        print("The selected algorithm is stateful, it will be processed sequentially.")
+
+    print(f"algorithm:\t{image_processor.algorithm_names[image_processor.selected_idx]}")
+    for filename_video in args.filename_video:
+        print(f"video:\t\t{filename_video}")
+        try:
+            stats = process_video(
+                image_processor,
+                filename_video,
+                args.filename_output,
+                args.output_fourcc,
+                args.processes,
+                args.warmup_frames,
+            )
+        except IOError as error:
+            # Continue with the next video.
+            print(f"Cannot process the video: {error}.")
+            continue
+        print(f"frames:\t\t{stats['frames']}")
+        print(f"wall time:\t{stats['wall_time']:.3f} s")
+        print(f"fps:\t\t{stats['fps']:.1f}")
+    if image_processor.change_detector is not None:
+        print(f"skipped:\t{image_processor.frames_skipped} (static)")
+
+
+# =========================================================================================
+#       BATCH PROCESSING OF IMAGES
+# =========================================================================================
+
+
+def main_batch(args):
+    """
+    This function processes the images of a directory (or matching a glob pattern) once with the selected algorithm
+    without any UI and reports the throughput and how the time was split between decoding, processing and encoding.
+    """
+    from batch_processing import find_images, process_images
+    from image_processor import ImageProcessor
+
+    image_processor = ImageProcessor(
+        get_algorithms(args.pipelines),
+        args.selected_idx,
+        get_algorithm_settings(args),
+    )
+    filenames = find_images(args.images)
+    if not filenames:
+        print(f"No images found in {args.images}.")
+        return
+    if args.processes > 1 and image_processor.is_selected_stateful():
+        print("The selected algorithm is stateful, it will be processed sequentially.")
+
+    print(f"algorithm:\t{image_processor.algorithm_names[image_processor.selected_idx]}")
+    stats = process_images(
+        image_processor,
+        filenames,
+        args.filename_output,
+        args.processes,
+        args.decode_threads,
+        args.encode_threads,
+    )
+    print(f"images:\t\t{stats['images']}")
+    if stats["failed"]:
+        print(f"failed:\t\t{stats['failed']}")
+    print(f"wall time:\t{stats['wall_time']:.3f} s")
+    print(f"images/s:\t{stats['images_per_second']:.1f}")
+    # The steps overlap (they run on several threads or processes), so their summed times are compared.
+    total_time = stats["decode_time"] + stats["process_time"] + stats["encode_time"]
+    for label, step in (("decode:\t", "decode"), ("process:", "process"), ("encode:\t", "encode")):
+        step_time = stats[f"{step}_time"]
+        print(
+            f"{label}\t{step_time / max(1, stats['images'] + stats['failed']) * 1000:.2f} ms/image"
+            f"\t({step_time / total_time * 100 if total_time > 0 else 0:.0f} %)"
+        )
+
+
+# =========================================================================================
+#       CAPTURE MEASUREMENT
+# =========================================================================================
+
+
+def main_measure_capture(args):
+    """
+    This function grabs frames from every source without processing them and reports the settings negotiated with
+    the camera, the intervals between the grab() calls and the effective FPS. A video can stand in for a camera, the
+    camera settings are requested from it too (they are usually rejected).
+    """
+    import cv2
+
+    from camera_settings import (
+        apply_camera_settings,
+        format_camera_properties,
+        get_camera_properties,
+        measure_grab_intervals,
+    )
+
+    camera_settings = get_camera_settings(args)
+    requested = {name: value for name, value in camera_settings.items() if value is not None}
+    print(
+        "requested:\t"
+        + (", ".join(f"{name}: {value}" for name, value in requested.items()) or "driver defaults")
+    )
+    for name, source, _ in get_sources(args):
+        print(f"\nsource:\t\t{name}")
+        video_capture = cv2.VideoCapture(source)
+        if not video_capture.isOpened():
+            print("Cannot open video stream.")
+            continue
+        rejected = apply_camera_settings(video_capture, camera_settings)
+        print(f"negotiated:\t{format_camera_properties(get_camera_properties(video_capture), rejected)}")
+        stats = measure_grab_intervals(video_capture, args.measure_capture)
+        video_capture.release()
+        print(f"frames:\t\t{stats['frames']}")
+        if stats["first_frame_ms"] is not None:
+            print(f"first frame:\t{stats['first_frame_ms']:.1f} ms")
+        if stats["frames"] < 2:
+            print("Not enough frames could be grabbed to measure the intervals.")
+            continue
+        print(
+            f"interval:\tmean {stats['mean_ms']:.2f} ms\tp50 {stats['p50_ms']:.2f} ms"
+            f"\tp99 {stats['p99_ms']:.2f} ms\tmax {stats['max_ms']:.2f} ms"
+        )
+        print(f"fps:\t\t{stats['fps']:.1f}")
+        print(f"buffered:\t{stats['burst_frames']} frames (returned at once at the start)")
 
 
 # =========================================================================================
@@ -192,6 +553,29 @@ def main(stdscr):
 # =========================================================================================
 
 if __name__ == "__main__":
+    # The headless mode does not need curses at all.
+    args = get_args()
+    # Report invalid pipelines before curses takes over the terminal.
+    try:
+        get_algorithms(args.pipelines)
+    except ValueError as error:
+        print(f"invalid pipeline: {error}")
+        sys.exit(2)
+    # Only the metadata of the algorithms is needed for the table, so neither OpenCV nor curses nor a camera is
+    # initialized.
+    if args.print_markdown_table:
+        print_markdown_table(get_algorithms(args.pipelines))
+        sys.exit(0)
+    if args.measure_capture is not None:
+        main_measure_capture(args)
+        sys.exit(0)
+    if args.images is not None:
+        main_batch(args)
+        sys.exit(0)
+    if args.headless:
+        main_headless(args)
+        sys.exit(0)
+
     # To be able to print into the normal console, we need a workaround because otherwise
     # we will see nothing, when curses ends.
     mystdout = StdOutWrapper()
@@ -0,0 +1,193 @@
+import cv2
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# The boundary between the JPEG images of the MJPEG stream.
+BOUNDARY = "frame"
+
+# The clients wake up at least this often (in seconds) to notice that the server stopped.
+CLIENT_TIMEOUT = 0.5
+
+
+class MjpegStream:
+    """
+    The latest frame of one source and its JPEG encoding. The frames are encoded on a dedicated encoder thread, once
+    per frame for all clients. If the encoder or a client is slower than the processing, they skip to the latest
+    frame, so they never slow down the processing loop.
+    """
+
+    def __init__(self, quality=80):
+        self.quality = quality
+        self.condition = threading.Condition()
+        # The latest submitted frame that is not encoded yet.
+        self.frame = None
+        # The latest JPEG and its sequence number, which is increased with every encoded frame.
+        self.jpeg = None
+        self.sequence = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.__encoder, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, frame):
+        """
+        Hands a frame over to the encoder thread. The frame is copied, since the results of the algorithms are
+        written into reused buffers. A frame that was not encoded yet is replaced.
+        """
+        frame = frame.copy()
+        with self.condition:
+            self.frame = frame
+            self.condition.notify_all()
+
+    def wait_for_jpeg(self, sequence, timeout=None):
+        """
+        Waits until a JPEG newer than the given sequence number is available. Returns (sequence, jpeg) of the latest
+        JPEG or (sequence, None) if there was none within the timeout or the stream stopped.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.sequence > sequence or not self.running, timeout
+            )
+            if self.sequence > sequence:
+                return self.sequence, self.jpeg
+            return sequence, None
+
+    def __encoder(self):
+        """
+        The loop of the encoder thread.
+        """
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.frame is not None or not self.running)
+                if not self.running:
+                    return
+                frame = self.frame
+                self.frame = None
+            # Encode outside of the lock, so the processing loop can submit the next frame in the meantime.
+            ret, jpeg = cv2.imencode(
+                ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+            )
+            if not ret:
+                continue
+            with self.condition:
+                self.jpeg = jpeg.tobytes()
+                self.sequence += 1
+                self.condition.notify_all()
+
+
+class MjpegServer:
+    """
+    A small HTTP server that serves the processed frames of every source as an MJPEG stream, so they can be viewed
+    in a browser or consumed by other tools (e.g. `ffplay http://localhost:8080/stream.mjpg`). It serves:
+    - /stream.mjpg and /stream/<idx>.mjpg: the MJPEG stream of the first / the given source
+    - /snapshot.jpg and /snapshot/<idx>.jpg: the latest JPEG of the first / the given source
+    Every client is handled on its own thread.
+    """
+
+    def __init__(self, port, streams=1, host="localhost", quality=80):
+        self.streams = [MjpegStream(quality) for _ in range(streams)]
+        self.running = False
+        self.thread = None
+        self.http_server = ThreadingHTTPServer((host, port), self.__get_handler())
+        self.http_server.daemon_threads = True
+
+    def get_port(self):
+        """
+        Returns the port the server listens on (useful if it was started on port 0).
+        """
+        return self.http_server.server_address[1]
+
+    def start(self):
+        self.running = True
+        for stream in self.streams:
+            stream.start()
+        self.thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        for stream in self.streams:
+            stream.stop()
+        if self.thread is not None:
+            self.http_server.shutdown()
+            self.thread.join()
+            self.thread = None
+        self.http_server.server_close()
+
+    def submit(self, frame, stream_idx=0):
+        """
+        Publishes a new frame of the given source.
+        """
+        self.streams[stream_idx].submit(frame)
+
+    def __get_handler(self):
+        server = self
+
+        class MjpegRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                match = re.fullmatch(r"/(stream|snapshot)(?:/(\d+))?\.(mjpg|jpg)", self.path)
+                if match is None or (match.group(1) == "stream") != (match.group(3) == "mjpg"):
+                    self.send_error(404)
+                    return
+                stream_idx = int(match.group(2)) if match.group(2) is not None else 0
+                if stream_idx >= len(server.streams):
+                    self.send_error(404)
+                    return
+                if match.group(1) == "stream":
+                    self.__send_stream(server.streams[stream_idx])
+                else:
+                    self.__send_snapshot(server.streams[stream_idx])
+
+            def log_message(self, format, *args):
+                # Do not print every request into the terminal UI.
+                pass
+
+            def __send_snapshot(self, stream):
+                _, jpeg = stream.wait_for_jpeg(0, CLIENT_TIMEOUT)
+                if jpeg is None:
+                    self.send_error(503, "No frame available yet")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(jpeg)))
+                self.end_headers()
+                self.wfile.write(jpeg)
+
+            def __send_stream(self, stream):
+                self.send_response(200)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header(
+                    "Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+                )
+                self.end_headers()
+                sequence = 0
+                try:
+                    while server.running:
+                        # Only the latest JPEG is sent, so a slow client skips the frames it missed.
+                        sequence, jpeg = stream.wait_for_jpeg(sequence, CLIENT_TIMEOUT)
+                        if jpeg is None:
+                            continue
+                        self.wfile.write(
+                            f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                            f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                        )
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client disconnected.
+                    pass
+
+        return MjpegRequestHandler
@@ -0,0 +1,118 @@
+import cv2
+import math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from algorithms.properties import is_stateful
+
+
+# The look of the labels in the tiles.
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_FONT_SCALE = 0.5
+LABEL_COLOR = (0, 255, 255)
+LABEL_THICKNESS = 1
+
+
+class MosaicProcessor:
+    """
+    Runs several algorithms of the image processor on the same frame at the same time and composes their results
+    into one mosaic image with a labeled tile per algorithm.
+    The algorithms run on a thread pool, which works well since OpenCV releases the GIL. They share the frame
+    cache of the image processor, so the grayscale and blurred images are only computed once for all algorithms.
+    Every algorithm keeps its own params dictionary, so stateful algorithms work as usual.
+    """
+
+    def __init__(self, image_processor, algorithm_indices, tile_scale=0.5):
+        self.image_processor = image_processor
+        self.algorithm_indices = [
+            idx for idx in algorithm_indices if 0 <= idx < len(image_processor.functions)
+        ]
+        self.tile_scale = tile_scale
+        self.columns = max(1, math.ceil(math.sqrt(len(self.algorithm_indices))))
+        self.rows = max(1, math.ceil(len(self.algorithm_indices) / self.columns))
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.algorithm_indices)))
+        self.params = [dict() for _ in self.algorithm_indices]
+        # The mosaic is preallocated and only reallocated if the frame size changes.
+        self.mosaic = None
+        self.tile_size = None
+
+    def reset(self):
+        """
+        Drops the params of all algorithms, so they restart.
+        """
+        self.params = [dict() for _ in self.algorithm_indices]
+
+    def close(self):
+        self.executor.shutdown()
+
+    def process(self, frame_prev, frame_curr):
+        """
+        Processes the frame with all algorithms and returns the mosaic. If the frame did not change since the last
+        processed frame and all algorithms are stateless, the last mosaic is returned (see ImageProcessor).
+        """
+        functions = [self.image_processor.functions[idx] for idx in self.algorithm_indices]
+        if self.mosaic is not None and self.image_processor.is_unchanged(frame_curr, functions):
+            return self.mosaic
+        self.__allocate(frame_curr)
+        # The frames of the cache must be updated before the threads start using it.
+        frame_cache = self.image_processor.frame_cache
+        frame_cache.update(frame_prev, frame_curr)
+        futures = [
+            self.executor.submit(self.__process_tile, tile_idx, frame_prev, frame_curr)
+            for tile_idx in range(len(self.algorithm_indices))
+        ]
+        for future in futures:
+            future.result()
+        change_detector = self.image_processor.change_detector
+        if change_detector is not None and not any(is_stateful(function) for function in functions):
+            change_detector.accept(frame_curr)
+        return self.mosaic
+
+    def __allocate(self, frame):
+        height, width = frame.shape[:2]
+        tile_size = (
+            max(1, round(width * self.tile_scale)),
+            max(1, round(height * self.tile_scale)),
+        )
+        if tile_size == self.tile_size:
+            return
+        self.tile_size = tile_size
+        self.mosaic = np.zeros(
+            (self.rows * tile_size[1], self.columns * tile_size[0], 3), dtype=np.uint8
+        )
+
+    def __process_tile(self, tile_idx, frame_prev, frame_curr):
+        params = self.params[tile_idx]
+        params["frame_prev"] = frame_prev
+        params["frame_curr"] = frame_curr
+        params["frame_cache"] = self.image_processor.frame_cache
+        params["buffer_pool"] = self.image_processor.buffer_pool
+        params["settings"] = self.image_processor.settings
+        params["tiled_executor"] = self.image_processor.tiled_executor
+        params["algorithm_name"] = self.image_processor.algorithm_names[self.algorithm_indices[tile_idx]]
+        params = self.image_processor.functions[self.algorithm_indices[tile_idx]](params)
+        self.params[tile_idx] = params
+
+        # Write the result into its tile of the mosaic.
+        tile_width, tile_height = self.tile_size
+        row, column = divmod(tile_idx, self.columns)
+        tile = self.mosaic[
+            row * tile_height : (row + 1) * tile_height,
+            column * tile_width : (column + 1) * tile_width,
+        ]
+        frame_result = params["frame_result"]
+        if frame_result.ndim == 2:
+            cv2.cvtColor(
+                cv2.resize(frame_result, self.tile_size), cv2.COLOR_GRAY2BGR, dst=tile
+            )
+        else:
+            cv2.resize(frame_result, self.tile_size, dst=tile)
+        cv2.putText(
+            tile,
+            f"{self.algorithm_indices[tile_idx]:03d} {params['algorithm_name']}",
+            (5, 20),
+            LABEL_FONT,
+            LABEL_FONT_SCALE,
+            LABEL_COLOR,
+            LABEL_THICKNESS,
+        )
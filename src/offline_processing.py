@@ -0,0 +1,105 @@
+import cv2
+import time
+
+from frame_capture import CapturePolicy, FrameCapture
+from parallel_executor import ParallelExecutor
+
+
+# The FPS of the output video if the input video does not report its FPS.
+DEFAULT_OUTPUT_FPS = 30
+
+
+def read_frames(frame_capture):
+    """
+    Yields the frames of the frame capture until the source ended.
+    """
+    while True:
+        ret, frame = frame_capture.read()
+        if not ret:
+            return
+        yield frame
+
+
+def process_frames(image_processor, frames):
+    """
+    Processes the frames one after another with the selected algorithm of the image processor and yields the
+    results.
+    """
+    params = dict()
+    frame_prev = None
+    for frame_curr in frames:
+        # The first frame has no predecessor, so it is its own previous frame. This way the output video has
+        # as many frames as the input video.
+        params["frame_prev"] = frame_prev if frame_prev is not None else frame_curr
+        params["frame_curr"] = frame_curr
+        params = image_processor.process(params)
+        yield params["frame_result"]
+        frame_prev = frame_curr
+
+
+def process_video(
+    image_processor,
+    filename_input,
+    filename_output=None,
+    fourcc="mp4v",
+    processes=1,
+    warmup_frames=0,
+):
+    """
+    Pushes the video once through the algorithm currently selected in the image processor without any UI.
+    If a filename for the output is given, the results are written with cv2.VideoWriter.
+    If more than one process is given, the frames are processed on a pool of worker processes (see
+    ParallelExecutor).
+    Returns a dictionary with the statistics of the run (frames, wall_time, fps).
+    """
+    frame_capture = FrameCapture(filename_input, policy=CapturePolicy.LOSSLESS)
+    if not frame_capture.is_opened():
+        raise IOError(f"cannot open video {filename_input}")
+    output_fps = frame_capture.get_fps() or DEFAULT_OUTPUT_FPS
+
+    if processes > 1:
+        parallel_executor = ParallelExecutor(
+            image_processor.get_selected_function(),
+            stateful=image_processor.is_selected_stateful(),
+            processes=processes,
+            warmup_frames=warmup_frames,
+            settings=image_processor.settings,
+        )
+        results = parallel_executor.process(read_frames(frame_capture))
+    else:
+        results = process_frames(image_processor, read_frames(frame_capture))
+
+    video_writer = None
+    frames = 0
+    time_start = time.perf_counter()
+    frame_capture.start()
+    try:
+        for frame_result in results:
+            if filename_output is not None:
+                if video_writer is None:
+                    # The writer can only be created now since the results of some algorithms are single
+                    # channel images.
+                    height, width = frame_result.shape[:2]
+                    video_writer = cv2.VideoWriter(
+                        filename_output,
+                        cv2.VideoWriter_fourcc(*fourcc),
+                        output_fps,
+                        (width, height),
+                        isColor=frame_result.ndim == 3,
+                    )
+                    if not video_writer.isOpened():
+                        raise IOError(f"cannot open video writer for {filename_output}")
+                video_writer.write(frame_result)
+            frames += 1
+    finally:
+        results.close()
+        frame_capture.stop()
+        if video_writer is not None:
+            video_writer.release()
+
+    wall_time = time.perf_counter() - time_start
+    return {
+        "frames": frames,
+        "wall_time": wall_time,
+        "fps": frames / wall_time if wall_time > 0 else 0,
+    }
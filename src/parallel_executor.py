@@ -0,0 +1,102 @@
+import multiprocessing
+from collections import deque
+
+
+def process_chunk(function, frame_prev, frames, warmup_frames=0, settings=None):
+    """
+    Processes consecutive frames with a fresh params dictionary and returns the results in order.
+    The results of the first warmup_frames frames are discarded, they are only used to build up the state of
+    stateful algorithms.
+    This function runs in the worker processes, so it has to be defined on module level.
+    """
+    params = {"settings": settings}
+    results = []
+    for idx, frame_curr in enumerate(frames):
+        params["frame_prev"] = frame_prev
+        params["frame_curr"] = frame_curr
+        params = function(params)
+        if idx >= warmup_frames:
+            results.append(params["frame_result"])
+        frame_prev = frame_curr
+    return results
+
+
+class ParallelExecutor:
+    """
+    Splits the frames of a video into chunks of consecutive frames, processes them on a pool of worker processes
+    and puts the results back in order.
+    Stateless algorithms can process every chunk independently. Stateful algorithms either fall back to a sequential
+    execution or, if warmup_frames is set, every chunk is preceded by the given number of frames of the previous
+    chunk to build up the state of the algorithm before its results are used.
+    """
+
+    def __init__(
+        self,
+        function,
+        stateful=False,
+        processes=None,
+        chunk_size=8,
+        warmup_frames=0,
+        settings=None,
+    ):
+        self.function = function
+        # The settings of the algorithm (see get_setting in algorithms/properties.py).
+        self.settings = settings
+        self.processes = processes if processes is not None else multiprocessing.cpu_count()
+        self.chunk_size = max(1, chunk_size)
+        self.warmup_frames = warmup_frames if stateful else 0
+        self.sequential = self.processes <= 1 or (stateful and warmup_frames <= 0)
+        # Limit the number of chunks in flight, otherwise a long video will be read into the memory completely.
+        self.max_chunks_in_flight = 2 * self.processes
+
+    def process(self, frames):
+        """
+        Processes the given iterable of frames and yields the results in the same order.
+        The first frame has no predecessor, so it is used as its own previous frame.
+        """
+        if self.sequential:
+            yield from self.__process_sequentially(frames)
+            return
+
+        # The last frames of the previous chunk, needed for the warmup and the previous frame of the next chunk.
+        history = deque(maxlen=self.warmup_frames + 1)
+        pending = deque()
+        chunk = []
+        with multiprocessing.Pool(self.processes) as pool:
+            for frame in frames:
+                chunk.append(frame)
+                if len(chunk) < self.chunk_size:
+                    continue
+                pending.append(self.__submit(pool, history, chunk))
+                history.extend(chunk)
+                chunk = []
+                # Wait for the oldest chunk if there are too many in flight.
+                while len(pending) >= self.max_chunks_in_flight:
+                    yield from pending.popleft().get()
+            if chunk:
+                pending.append(self.__submit(pool, history, chunk))
+            while pending:
+                yield from pending.popleft().get()
+
+    def __submit(self, pool, history, chunk):
+        history = list(history)
+        warmup_frames = min(self.warmup_frames, len(history))
+        frames = history[len(history) - warmup_frames :] + chunk
+        frame_prev = (
+            history[len(history) - warmup_frames - 1]
+            if len(history) > warmup_frames
+            else frames[0]
+        )
+        return pool.apply_async(
+            process_chunk, (self.function, frame_prev, frames, warmup_frames, self.settings)
+        )
+
+    def __process_sequentially(self, frames):
+        params = {"settings": self.settings}
+        frame_prev = None
+        for frame_curr in frames:
+            params["frame_prev"] = frame_prev if frame_prev is not None else frame_curr
+            params["frame_curr"] = frame_curr
+            params = self.function(params)
+            yield params["frame_result"]
+            frame_prev = frame_curr
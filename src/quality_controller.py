@@ -0,0 +1,72 @@
+import cv2
+
+
+# The scales the frames can be processed at, from the full resolution down to the smallest one.
+SCALES = (1.0, 0.75, 0.5, 0.35, 0.25)
+
+
+class QualityController:
+    """
+    Keeps the processing time per frame within a latency budget by processing downscaled frames.
+    If the (smoothed) processing time exceeds the budget for some frames, the next smaller scale is used. If there
+    is enough headroom, i.e. the time expected at the next larger scale (the time grows with the number of pixels)
+    still fits into headroom * budget, the next larger scale is used again.
+    """
+
+    def __init__(self, latency_budget, scales=SCALES, headroom=0.8, frames_to_switch=10):
+        self.latency_budget = latency_budget
+        self.scales = scales
+        self.headroom = headroom
+        self.frames_to_switch = frames_to_switch
+        self.scale_idx = 0
+        self.processing_time = 0
+        self.frames_over_budget = 0
+        self.frames_with_headroom = 0
+
+    def get_scale(self):
+        return self.scales[self.scale_idx]
+
+    def update(self, processing_time):
+        """
+        Records the processing time (in seconds) of the last frame. Returns True if the scale changed.
+        """
+        self.processing_time = 0.8 * self.processing_time + 0.2 * processing_time
+
+        if self.processing_time > self.latency_budget:
+            self.frames_over_budget += 1
+        else:
+            self.frames_over_budget = 0
+        if self.scale_idx > 0:
+            larger_scale = self.scales[self.scale_idx - 1]
+            expected_time = self.processing_time * (larger_scale / self.get_scale()) ** 2
+            if expected_time < self.headroom * self.latency_budget:
+                self.frames_with_headroom += 1
+            else:
+                self.frames_with_headroom = 0
+
+        if (
+            self.frames_over_budget >= self.frames_to_switch
+            and self.scale_idx < len(self.scales) - 1
+        ):
+            self.__switch(self.scale_idx + 1)
+            return True
+        if self.frames_with_headroom >= self.frames_to_switch and self.scale_idx > 0:
+            self.__switch(self.scale_idx - 1)
+            return True
+        return False
+
+    def __switch(self, scale_idx):
+        # The processing time is expected to change with the number of pixels.
+        self.processing_time *= (self.scales[scale_idx] / self.get_scale()) ** 2
+        self.scale_idx = scale_idx
+        self.frames_over_budget = 0
+        self.frames_with_headroom = 0
+
+
+def scale_frame(frame, scale):
+    """
+    Returns the frame scaled by the given factor.
+    """
+    if scale == 1:
+        return frame
+    return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
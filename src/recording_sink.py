@@ -0,0 +1,105 @@
+import cv2
+import queue
+import threading
+
+
+class RecordingSink:
+    """
+    Writes frames into a video on a dedicated writer thread, so that a slow disk never stalls the processing loop.
+    The frames wait in a bounded queue. If it is full, the new frame is dropped and counted.
+    The video is always written in BGR: single channel results (grayscale, binarization, edges) are converted, and
+    frames of a different size (e.g. after switching to a mosaic) are resized to the size of the first frame.
+    If the video cannot be opened (e.g. the codec is not available), the sink is marked as failed and does not accept
+    frames anymore.
+    """
+
+    def __init__(self, filename, fourcc="mp4v", fps=30, queue_size=32):
+        self.filename = filename
+        self.fourcc = fourcc
+        self.fps = fps
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Some statistics.
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.failed = False
+        # The dropped frames are counted by the processing loop and the writer thread.
+        self.lock = threading.Lock()
+        self.video_writer = None
+        # The size of the video, given by the first frame.
+        self.size = None
+        self.thread = None
+
+    def get_queue_depth(self):
+        return self.queue.qsize()
+
+    def start(self):
+        """
+        Starts the writer thread.
+        """
+        self.thread = threading.Thread(target=self.__writer, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Writes the queued frames, stops the writer thread and closes the video.
+        """
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.video_writer is not None:
+            self.video_writer.release()
+            self.video_writer = None
+
+    def submit(self, frame):
+        """
+        Queues a frame for writing. The frame is copied, since the results of the algorithms are written into
+        reused buffers. Returns False if the queue is full or the video could not be opened and the frame was dropped.
+        """
+        if self.failed:
+            self.__count_dropped()
+            return False
+        try:
+            self.queue.put_nowait(frame.copy())
+        except queue.Full:
+            self.__count_dropped()
+            return False
+        return True
+
+    def __count_dropped(self):
+        with self.lock:
+            self.frames_dropped += 1
+
+    def __writer(self):
+        """
+        The loop of the writer thread.
+        """
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                return
+            if self.failed:
+                # Keep emptying the queue, so that stop() is not blocked by a full queue.
+                self.__count_dropped()
+                continue
+            if frame.ndim == 2:
+                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+            if self.video_writer is None:
+                self.video_writer = cv2.VideoWriter(
+                    self.filename,
+                    cv2.VideoWriter_fourcc(*self.fourcc),
+                    self.fps,
+                    (frame.shape[1], frame.shape[0]),
+                )
+                if not self.video_writer.isOpened():
+                    self.video_writer.release()
+                    self.video_writer = None
+                    self.failed = True
+                    self.__count_dropped()
+                    continue
+                self.size = (frame.shape[1], frame.shape[0])
+            elif (frame.shape[1], frame.shape[0]) != self.size:
+                frame = cv2.resize(frame, self.size)
+            self.video_writer.write(frame)
+            self.frames_written += 1
+
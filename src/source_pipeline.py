@@ -0,0 +1,216 @@
+import cv2
+import time
+
+from frame_capture import CapturePolicy, FrameCapture
+from frame_pacer import FramePacer, PacingMode
+from image_processor import ImageProcessor
+from mosaic import MosaicProcessor
+from quality_controller import QualityController, scale_frame
+
+
+class SourcePipeline:
+    """
+    Everything that belongs to one source (camera or video): its frame capture, pacing, image processor (with its
+    own frame cache and buffers) and the params of the algorithms, so that e.g. the tracked points of the optical
+    flow of one source never mix with the ones of another source.
+    The frames are processed on a worker pool shared by all sources. A pipeline has at most one frame in flight, so
+    a slow source cannot fill the pool and starve the others.
+    """
+
+    def __init__(
+        self,
+        name,
+        source,
+        is_video,
+        functions,
+        selected_idx=0,
+        settings=None,
+        tiled_executor=None,
+        change_tolerance=None,
+        incremental_tolerance=None,
+        capture_policy=None,
+        capture_buffer_size=4,
+        pacing_mode=None,
+        target_fps=0,
+        latency_budget=None,
+        mosaic=None,
+        loop_cache=None,
+        camera_settings=None,
+    ):
+        self.name = name
+
+        # The frames are read on a separate thread, for a camera we only want the freshest frame, a video shall be
+        # processed without losing any frame. The camera settings are only requested from cameras.
+        if capture_policy is None:
+            capture_policy = CapturePolicy.LOSSLESS if is_video else CapturePolicy.LATEST
+        self.frame_capture = FrameCapture(
+            source,
+            policy=capture_policy,
+            buffer_size=capture_buffer_size,
+            loop=is_video,
+            loop_cache=loop_cache,
+            camera_settings=camera_settings if not is_video else None,
+        )
+
+        # A camera is paced to its FPS, a video is processed as fast as possible.
+        if pacing_mode is None:
+            pacing_mode = PacingMode.UNLIMITED if is_video else PacingMode.SOURCE
+        self.frame_pacer = FramePacer(pacing_mode, self.frame_capture.get_fps(), target_fps)
+
+        self.image_processor = ImageProcessor(
+            functions,
+            selected_idx,
+            settings=settings,
+            tiled_executor=tiled_executor,
+            change_tolerance=change_tolerance,
+            incremental_tolerance=incremental_tolerance,
+        )
+        self.mosaic_processor = (
+            MosaicProcessor(self.image_processor, mosaic) if mosaic else None
+        )
+
+        # If a latency budget (in seconds) is given, the frames are downscaled whenever the processing takes too
+        # long.
+        self.quality_controller = (
+            QualityController(latency_budget) if latency_budget is not None else None
+        )
+
+        self.params = dict()
+        # The changes requested by the UI, they are applied before the next frame is processed, since a frame may
+        # be processed on the worker pool at the same time.
+        self.reset_requested = False
+        self.selected_idx_requested = None
+        self.frame_prev = None
+        # The previous frame at the scale the frames are processed at.
+        self.frame_prev_scaled = None
+        # The processing of the current frame on the worker pool.
+        self.future = None
+
+    def is_opened(self):
+        return self.frame_capture.is_opened()
+
+    def is_ready(self):
+        """
+        Returns True if the next frame of this source can be processed.
+        """
+        return (
+            self.future is None
+            and self.frame_capture.has_frame()
+            and self.frame_pacer.is_due()
+        )
+
+    def is_ended(self):
+        return self.future is None and self.frame_capture.is_ended()
+
+    def start(self):
+        self.frame_capture.start()
+
+    def stop(self):
+        self.frame_capture.stop()
+        if self.mosaic_processor is not None:
+            self.mosaic_processor.close()
+
+    def reset(self):
+        """
+        Drops the params of the algorithms with the next frame, so they restart.
+        """
+        self.reset_requested = True
+
+    def select_algorithm(self, selected_idx):
+        """
+        Switches to the given algorithm with the next frame.
+        """
+        self.selected_idx_requested = selected_idx
+        # Drop the params, since they may contain further informations from the previous algorithm.
+        self.reset_requested = True
+
+    def submit(self, executor, stage_timer, stage_suffix=""):
+        """
+        Reads the next frame and starts its processing on the executor. The result is available through
+        self.future as (frame_curr, frame_result, timestamp) and has to be collected before this pipeline is
+        ready again. The stages are recorded with the given suffix (e.g. the name of the source).
+        """
+        ret, frame_curr = self.frame_capture.read()
+        if not ret:
+            return
+        self.frame_pacer.next_frame()
+        self.future = executor.submit(
+            self.__process, frame_curr, self.frame_capture.timestamp, stage_timer, stage_suffix
+        )
+
+    def collect(self):
+        """
+        Returns the result of the frame in flight (see submit()) and makes this pipeline ready for the next frame.
+        """
+        result = self.future.result()
+        self.future = None
+        return result
+
+    def __process(self, frame_curr, timestamp, stage_timer, stage_suffix):
+        # How long the frame waited since it was captured.
+        stage_timer.record("capture" + stage_suffix, time.perf_counter() - timestamp, self.name)
+        if self.selected_idx_requested is not None:
+            self.image_processor.selected_idx = self.selected_idx_requested
+            self.selected_idx_requested = None
+        if self.reset_requested:
+            self.reset_requested = False
+            self.__reset()
+        if self.frame_prev is None:
+            self.frame_prev = frame_curr
+            self.frame_prev_scaled = frame_curr
+
+        # Scale the frame down if the processing does not fit into the latency budget.
+        scale = (
+            self.quality_controller.get_scale()
+            if self.quality_controller is not None
+            else 1
+        )
+        frame_curr_scaled = scale_frame(frame_curr, scale)
+
+        # Update the parameters for the image processor.
+        self.params["frame_prev"] = self.frame_prev_scaled
+        self.params["frame_curr"] = frame_curr_scaled
+
+        # Process the image.
+        time_start = time.perf_counter()
+        if self.mosaic_processor is not None:
+            self.params["frame_result"] = self.mosaic_processor.process(
+                self.frame_prev_scaled, frame_curr_scaled
+            )
+        else:
+            self.params = self.image_processor.process(self.params)
+        processing_time = time.perf_counter() - time_start
+        stage_timer.record("process" + stage_suffix, processing_time, self.name)
+
+        # The processed image is scaled back to the size of the original image (a mosaic to its tiles of that size),
+        # so the size of the result does not change with the scale.
+        frame_result = self.params["frame_result"]
+        if scale != 1:
+            frame_result = cv2.resize(
+                frame_result,
+                (
+                    round(frame_result.shape[1] * frame_curr.shape[1] / frame_curr_scaled.shape[1]),
+                    round(frame_result.shape[0] * frame_curr.shape[0] / frame_curr_scaled.shape[0]),
+                ),
+            )
+
+        # Update the previous frame.
+        self.frame_prev = frame_curr
+        self.frame_prev_scaled = frame_curr_scaled
+
+        # Adapt the scale to the processing time.
+        if self.quality_controller is not None and self.quality_controller.update(
+            processing_time
+        ):
+            # The state of the algorithms (e.g. the tracked points) belongs to the old scale, so restart them.
+            self.__reset()
+            self.frame_prev_scaled = scale_frame(
+                self.frame_prev, self.quality_controller.get_scale()
+            )
+
+        return frame_curr, frame_result, timestamp
+
+    def __reset(self):
+        self.params = dict()
+        if self.mosaic_processor is not None:
+            self.mosaic_processor.reset()
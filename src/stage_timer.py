@@ -0,0 +1,140 @@
+import csv
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class RollingHistogram:
+    """
+    A histogram of the last values (e.g. latencies in seconds) with logarithmically spaced buckets.
+    Adding a value is cheap (no sorting, no allocation), the percentiles are read from the bucket counts and are
+    therefore only as accurate as the bucket width (BUCKETS_PER_OCTAVE buckets per doubling of the value).
+    """
+
+    BUCKETS_PER_OCTAVE = 8
+    # The smallest value that gets its own bucket, all smaller values are counted in the first bucket.
+    MIN_VALUE = 1e-6
+    NUMBER_OF_BUCKETS = 24 * BUCKETS_PER_OCTAVE
+
+    def __init__(self, window=300):
+        self.window = window
+        self.buckets = deque()
+        self.counts = [0] * self.NUMBER_OF_BUCKETS
+        self.last_value = 0
+
+    def add(self, value):
+        self.last_value = value
+        bucket = 0
+        if value > self.MIN_VALUE:
+            bucket = min(
+                int(math.log2(value / self.MIN_VALUE) * self.BUCKETS_PER_OCTAVE),
+                self.NUMBER_OF_BUCKETS - 1,
+            )
+        self.buckets.append(bucket)
+        self.counts[bucket] += 1
+        if len(self.buckets) > self.window:
+            self.counts[self.buckets.popleft()] -= 1
+
+    def percentile(self, p):
+        """
+        Returns the upper bound of the bucket that contains the p-th percentile (0 <= p <= 100).
+        """
+        if not self.buckets:
+            return 0
+        rank = p / 100 * len(self.buckets)
+        cumulative = 0
+        for bucket, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank and count > 0:
+                return self.MIN_VALUE * 2 ** ((bucket + 1) / self.BUCKETS_PER_OCTAVE)
+        return self.MIN_VALUE * 2 ** (self.NUMBER_OF_BUCKETS / self.BUCKETS_PER_OCTAVE)
+
+
+class StageTimer:
+    """
+    Measures how long every stage of the main loop (capture, processing, display, ...) takes per frame.
+    The durations are kept in a rolling histogram per stage. If tracing is enabled, the durations of every frame
+    are also kept, so that they can be exported to a CSV or JSON trace file. The trace has a row per frame of every
+    source, stages that do not belong to a frame (e.g. waiting for the window events) are only kept in the
+    histograms.
+    """
+
+    def __init__(self, window=300, trace=False):
+        self.window = window
+        self.trace = trace
+        self.histograms = dict()
+        # The row of the current frame and the number of finished frames of every source.
+        self.current_rows = dict()
+        self.frame_indices = dict()
+        self.rows = []
+        # The stages that were recorded for a frame, they are the columns of the trace.
+        self.traced_stages = dict()
+        # The stages may be recorded from several threads (e.g. the pipelines of several sources).
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, stage, source=None):
+        """
+        Measures the duration of the code in the with-statement as the given stage (see record).
+        """
+        time_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - time_start, source)
+
+    def record(self, stage, duration, source=None):
+        """
+        Records the duration (in seconds) of the given stage. If a source is given, the duration belongs to its
+        current frame.
+        """
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = RollingHistogram(self.window)
+            histogram.add(duration)
+            if self.trace and source is not None:
+                self.current_rows.setdefault(source, dict())[stage] = duration
+                self.traced_stages[stage] = None
+
+    def next_frame(self, source):
+        """
+        Finishes the current frame of the given source.
+        """
+        with self.lock:
+            frame_idx = self.frame_indices.get(source, 0)
+            self.frame_indices[source] = frame_idx + 1
+            if self.trace:
+                row = self.current_rows.pop(source, dict())
+                row["source"] = source
+                row["frame"] = frame_idx
+                row["time"] = time.time()
+                self.rows.append(row)
+
+    def get_summary(self):
+        """
+        Returns a list of (stage, last, p50, p99) tuples with the durations in seconds.
+        """
+        with self.lock:
+            return [
+                (stage, histogram.last_value, histogram.percentile(50), histogram.percentile(99))
+                for stage, histogram in self.histograms.items()
+            ]
+
+    def export_trace(self, filename):
+        """
+        Writes the durations of all traced frames to the given file. The format depends on the file extension,
+        '.json' results in a JSON file, everything else in a CSV file.
+        """
+        if filename.lower().endswith(".json"):
+            with open(filename, "w") as file:
+                json.dump(self.rows, file)
+            return
+        fieldnames = ["source", "frame", "time"] + list(self.traced_stages)
+        with open(filename, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self.rows)
@@ -0,0 +1,121 @@
+import curses
+import queue
+import threading
+import time
+
+
+# The pressed keys are polled this often (in seconds).
+KEY_POLL_INTERVAL = 0.01
+
+# The statistics change with every frame, so they are only redrawn this often (in seconds).
+REDRAW_INTERVAL = 0.1
+
+# The color pairs of the lines.
+COLOR_NORMAL = 1
+COLOR_SELECTED = 2
+
+
+class TerminalUI:
+    """
+    Draws the terminal UI with curses on its own thread, so that the processing loop never waits for the terminal.
+    The lines to show are collected by get_lines(), which returns a list of (text, selected) tuples. They are
+    collected every REDRAW_INTERVAL seconds or as soon as a redraw is requested (e.g. when the selection changed),
+    and only the lines that differ from the ones on the screen are drawn again.
+    The pressed keys are read on the same thread (curses must only be used by one thread) and put into a queue,
+    see get_key().
+    """
+
+    def __init__(self, stdscr, get_lines, stage_timer=None):
+        self.stdscr = stdscr
+        self.get_lines = get_lines
+        # If a stage timer is given, the duration of every redraw is recorded as stage "ui".
+        self.stage_timer = stage_timer
+        self.keys = queue.Queue()
+        self.redraw_requested = threading.Event()
+        self.lines = []
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        # Black text on white background, white text on black background for the selection.
+        curses.start_color()
+        curses.init_pair(COLOR_NORMAL, curses.COLOR_BLACK, curses.COLOR_WHITE)
+        curses.init_pair(COLOR_SELECTED, curses.COLOR_WHITE, curses.COLOR_BLACK)
+        # Set the entire background to white
+        self.stdscr.bkgd(" ", curses.color_pair(COLOR_NORMAL))
+        self.stdscr.clear()
+        # Turn off cursor blinking
+        curses.curs_set(0)
+        # Otherwise, opencvs window will not open:
+        self.stdscr.nodelay(1)
+
+        self.running = True
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.redraw_requested.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def request_redraw(self):
+        self.redraw_requested.set()
+
+    def get_key(self):
+        """
+        Returns the next pressed key or -1 if no key was pressed (like getch() in the nodelay mode).
+        """
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return -1
+
+    def __run(self):
+        """
+        The loop of the UI thread.
+        """
+        next_redraw = 0
+        while self.running:
+            key = self.stdscr.getch()
+            while key != -1:
+                self.keys.put(key)
+                key = self.stdscr.getch()
+
+            now = time.perf_counter()
+            if self.redraw_requested.is_set() or now >= next_redraw:
+                self.redraw_requested.clear()
+                self.__draw()
+                next_redraw = now + REDRAW_INTERVAL
+            self.redraw_requested.wait(KEY_POLL_INTERVAL)
+
+    def __draw(self):
+        time_start = time.perf_counter()
+        lines = self.get_lines()
+        height, width = self.stdscr.getmaxyx()
+        for row, line in enumerate(lines):
+            if row < len(self.lines) and self.lines[row] == line:
+                continue
+            text, selected = line
+            try:
+                self.stdscr.move(row, 0)
+                self.stdscr.clrtoeol()
+                self.stdscr.addnstr(
+                    row,
+                    0,
+                    text,
+                    width - 1,
+                    curses.color_pair(COLOR_SELECTED if selected else COLOR_NORMAL),
+                )
+            except curses.error:
+                # The terminal is too small to show all lines.
+                break
+        if len(lines) < len(self.lines) and len(lines) < height:
+            # Remove the lines that are not needed anymore.
+            self.stdscr.move(len(lines), 0)
+            self.stdscr.clrtobot()
+        self.lines = lines
+        self.stdscr.refresh()
+        if self.stage_timer is not None:
+            self.stage_timer.record("ui", time.perf_counter() - time_start)
@@ -0,0 +1,50 @@
+import numpy as np
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TiledExecutor:
+    """
+    Runs a neighborhood filter (blur, sobel, adaptive threshold, ...) on horizontal strips of a frame in a thread
+    pool, which works well since OpenCV releases the GIL.
+    Every strip is extended by a halo of rows on both sides, which has to be at least the radius of the filter's
+    kernel. The rows of the halo are only used as input, their results are dropped. This way the stitched result
+    is identical to the result of the untiled filter: the rows close to the borders of a strip see the same
+    neighbors as in the full frame, and the strips at the top and bottom end at the real borders of the frame.
+    """
+
+    def __init__(self, threads=None, min_rows_per_strip=64):
+        self.threads = threads if threads is not None else os.cpu_count()
+        self.min_rows_per_strip = min_rows_per_strip
+        self.executor = ThreadPoolExecutor(max_workers=self.threads)
+
+    def close(self):
+        self.executor.shutdown()
+
+    def apply(self, function, src, halo, dst=None):
+        """
+        Applies function(src, dst) to the strips of src and writes the results into dst (allocated like src if
+        not given). The function has to return its result (like the OpenCV functions do), it has the same number
+        of rows and columns as its input.
+        """
+        height = src.shape[0]
+        if dst is None:
+            dst = np.empty(src.shape[:2], dtype=src.dtype)
+        strips = min(self.threads, max(1, height // self.min_rows_per_strip))
+        if strips == 1:
+            return function(src, dst)
+
+        bounds = [(idx * height // strips, (idx + 1) * height // strips) for idx in range(strips)]
+        futures = [
+            self.executor.submit(self.__apply_strip, function, src, halo, dst, start, end)
+            for start, end in bounds
+        ]
+        for future in futures:
+            future.result()
+        return dst
+
+    def __apply_strip(self, function, src, halo, dst, start, end):
+        start_halo = max(0, start - halo)
+        end_halo = min(src.shape[0], end + halo)
+        result = function(src[start_halo:end_halo], None)
+        dst[start:end] = result[start - start_halo : end - start_halo]